@@ -3,6 +3,7 @@ from django.contrib.auth import authenticate
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 from auth_app.models import UserProfile
+from core.serializers import CompiledReadSerializer
 from django.contrib.auth.models import User
 
 
@@ -148,6 +149,46 @@ class BusinessListSerializer(serializers.ModelSerializer):
         return data
 
 
+class BusinessListCompiledSerializer(CompiledReadSerializer):
+    """
+    Compiled read serializer producing the same output as BusinessListSerializer
+    from `.values()` rows, with empty strings instead of None.
+    """
+    fields = (
+        ("user", "user", None),
+        ("username", "user__username", None),
+        ("first_name", "first_name", "get_first_name"),
+        ("last_name", "last_name", "get_last_name"),
+        ("file", "file", "get_file"),
+        ("location", "location", "get_location"),
+        ("tel", "tel", "get_tel"),
+        ("description", "description", "get_description"),
+        ("working_hours", "working_hours", "get_working_hours"),
+        ("type", "type", None),
+    )
+
+    def get_first_name(self, row):
+        return row["first_name"] or ""
+
+    def get_last_name(self, row):
+        return row["last_name"] or ""
+
+    def get_file(self, row):
+        return self.file_url(row["file"]) or ""
+
+    def get_location(self, row):
+        return row["location"] or ""
+
+    def get_tel(self, row):
+        return row["tel"] or ""
+
+    def get_description(self, row):
+        return row["description"] or ""
+
+    def get_working_hours(self, row):
+        return row["working_hours"] or ""
+
+
 class CustomerListSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source="user.username", read_only=True)
 
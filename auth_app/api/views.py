@@ -7,8 +7,11 @@ from .serializers import (
     UserProfileSerializer,
     UserProfilePatchSerializer,
     BusinessListSerializer,
+    BusinessListCompiledSerializer,
     CustomerListSerializer
 )
+from core.serializers import use_compiled_serializers
+from core.conditional import conditional_get
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.models import Token
@@ -59,6 +62,14 @@ class LoginView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def profile_changed_at(pk):
+    """
+    Returns the last change timestamp of a user profile for conditional requests.
+    """
+    return UserProfile.objects.filter(user__id=pk).values_list(
+        "updated_at", flat=True).first()
+
+
 class UserProfileView(APIView):
     """
     API endpoint for retrieving and updating a user profile.
@@ -68,9 +79,11 @@ class UserProfileView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(profile_changed_at)
     def get(self, request, pk):
         """
         Retrieves the profile for a specific user ID.
+        Answers 304 if the client's ETag or Last-Modified is still current.
         """
         try:
             profile = UserProfile.objects.get(user__id=pk)
@@ -110,7 +123,11 @@ class BusinessListView(APIView):
 
     def get(self, request):
         profiles = UserProfile.objects.filter(type="business")
-        serializer = BusinessListSerializer(profiles, many=True)
+        if use_compiled_serializers():
+            serializer = BusinessListCompiledSerializer(
+                profiles.values(*BusinessListCompiledSerializer.value_lookups()))
+        else:
+            serializer = BusinessListSerializer(profiles, many=True)
         return Response(serializer.data, status=200)
 
 
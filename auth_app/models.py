@@ -29,6 +29,9 @@ class UserProfile(models.Model):
     # Timestamp of profile creation
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Timestamp of the last profile update
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         # Returns a readable representation of the profile instance
         return f"Profile of {self.user.username}"
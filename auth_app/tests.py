@@ -1,3 +1,79 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from auth_app.api.serializers import BusinessListCompiledSerializer, BusinessListSerializer
+from auth_app.models import UserProfile
+from core.testing import (
+    NO_CACHE, benchmark, benchmark_size, create_user, report_rows_per_second,
+)
+
+
+@override_settings(CACHES=NO_CACHE)
+class BusinessListTests(TestCase):
+    """
+    Tests for GET /api/profiles/business/.
+    """
+
+    def setUp(self):
+        _, self.client = create_user("customer", "customer")
+        create_user("business", "business")
+        create_user("studio", "business", file="profile_pics/studio.png", location="Berlin")
+
+    def test_compiled_serializer_matches_model_serializer(self):
+        expected = self.client.get("/api/profiles/business/").json()
+        self.assertEqual(len(expected), 2)
+        with override_settings(COMPILED_READ_SERIALIZERS=True):
+            self.assertEqual(self.client.get("/api/profiles/business/").json(), expected)
+
+
+@override_settings(CACHES=NO_CACHE)
+class UserProfileConditionalGetTests(TestCase):
+    """
+    Tests for ETag and Last-Modified on GET /api/profile/<pk>/.
+    """
+
+    def test_matching_etag_returns_304_until_the_profile_changes(self):
+        user, client = create_user("business", "business")
+        url = f"/api/profile/{user.id}/"
+        etag = client.get(url).headers["ETag"]
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = client.patch(url, {"location": "Hamburg"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["location"], "Hamburg")
+
+
+@benchmark
+class BusinessListSerializerBenchmark(TestCase):
+    """
+    Rows per second of the business list serializers, ModelSerializer vs compiled.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile_count = benchmark_size(10000)
+        users = User.objects.bulk_create(
+            [User(username=f"business{i}") for i in range(cls.profile_count)],
+            batch_size=1000,
+        )
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=user, type="business", first_name="Studio", location="Berlin")
+             for user in users],
+            batch_size=1000,
+        )
+
+    def test_business_list_rows_per_second(self):
+        profiles = UserProfile.objects.filter(type="business")
+
+        def model_serializer():
+            return BusinessListSerializer(profiles.all(), many=True).data
+
+        def compiled():
+            rows = profiles.values(*BusinessListCompiledSerializer.value_lookups())
+            return BusinessListCompiledSerializer(rows).data
+
+        rates = report_rows_per_second("GET /api/profiles/business/", self.profile_count, {
+            "ModelSerializer": model_serializer, "compiled": compiled})
+        self.assertGreater(rates["compiled"], rates["ModelSerializer"])
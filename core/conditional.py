@@ -0,0 +1,34 @@
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def conditional_get(version_func):
+    """
+    Decorator for APIView GET handlers adding ETag and Last-Modified support.
+    `version_func(**kwargs)` receives the URL kwargs and returns the object's
+    last change timestamp (or None if it does not exist). It should be a cheap
+    single-column query; the handler itself only runs if the client's copy is stale.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            changed_at = version_func(**kwargs)
+            if changed_at is None:
+                return handler(self, request, *args, **kwargs)
+
+            key = "-".join(str(value) for value in kwargs.values())
+            etag = quote_etag(f"{key}-{int(changed_at.timestamp() * 1000000)}")
+            last_modified = int(changed_at.timestamp())
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = handler(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers["ETag"] = etag
+                response.headers["Last-Modified"] = http_date(last_modified)
+            return response
+        return wrapper
+    return decorator
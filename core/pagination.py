@@ -0,0 +1,210 @@
+import base64
+import datetime
+import decimal
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def get_pagination_mode(request, setting_name, default):
+    """
+    Returns 'cursor' or the endpoint's legacy mode name for a list request.
+    Chosen by ?pagination=, implied by ?cursor=, or taken from the given setting.
+    """
+    mode = request.query_params.get("pagination")
+    if mode in (default, "cursor"):
+        return mode
+    if request.query_params.get("cursor"):
+        return "cursor"
+    return getattr(settings, setting_name, default)
+
+
+class CursorEncoder(json.JSONEncoder):
+    """
+    JSON encoder for cursor values. Keeps full microsecond precision on
+    datetimes, which DjangoJSONEncoder would truncate to milliseconds.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date)):
+            return o.isoformat()
+        if isinstance(o, decimal.Decimal):
+            return str(o)
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a fixed tuple of ordering fields, e.g. ("-updated_at", "-id").
+    The cursor stores the ordering values of the last row of a page, so the next
+    page is fetched with a WHERE clause instead of OFFSET and no COUNT is needed.
+    The last ordering field must be unique (usually the primary key).
+    Fields listed in nullable_fields are ordered with NULLs last in both
+    directions, so the cursor condition is the same on every database.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 10
+    max_page_size = 10
+    invalid_cursor_message = "Invalid cursor."
+
+    def __init__(self, ordering=("-created_at", "-id"), nullable_fields=(), model=None):
+        self.ordering = tuple(ordering)
+        self.nullable_fields = frozenset(nullable_fields)
+        # Model whose fields convert the cursor values (defaults to the queryset's)
+        self.model = model
+
+    def get_page_size(self, request):
+        """
+        Returns the requested page size, capped at max_page_size.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def prepare(self, request):
+        """
+        Reads the page size and the decoded cursor position from the request.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.position = self.decode_cursor(request)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [self.to_python(field, value)
+                    for field, value in zip(self.ordering, position)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, field, value):
+        """
+        Converts a decoded cursor value with the model field it orders by,
+        so a crafted cursor can never reach the query with a wrong type.
+        """
+        name = self._field_name(field)
+        if value is None:
+            if name not in self.nullable_fields:
+                raise ValueError(f"{name} cannot be null.")
+            return None
+        if self.model is None:
+            return value
+        try:
+            model_field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        return model_field.to_python(value)
+
+    def encode_cursor(self, row):
+        position = [self._get_value(row, field) for field in self.ordering]
+        data = json.dumps(position, cls=CursorEncoder)
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @staticmethod
+    def _field_name(field):
+        return field.lstrip("-")
+
+    def _get_value(self, row, field):
+        name = self._field_name(field)
+        if isinstance(row, dict):
+            return row[name]
+        return getattr(row, name)
+
+    def get_order_by(self):
+        """
+        Returns the order_by() arguments for the ordering.
+        """
+        order_by = []
+        for field in self.ordering:
+            name = self._field_name(field)
+            if name not in self.nullable_fields:
+                order_by.append(field)
+            elif field.startswith("-"):
+                order_by.append(F(name).desc(nulls_last=True))
+            else:
+                order_by.append(F(name).asc(nulls_last=True))
+        return order_by
+
+    def get_keyset_q(self):
+        """
+        Returns the filter selecting all rows after the cursor position, e.g.
+        (updated_at < v1) OR (updated_at = v1 AND id < v2).
+        """
+        if self.position is None:
+            return Q()
+        keyset_q = Q()
+        equal_q = Q()
+        for field, value in zip(self.ordering, self.position):
+            name = self._field_name(field)
+            lookup = "lt" if field.startswith("-") else "gt"
+            if name not in self.nullable_fields:
+                keyset_q |= equal_q & Q(**{f"{name}__{lookup}": value})
+                equal_q &= Q(**{name: value})
+            elif value is None:
+                # NULLs come last, so only other NULLs can follow
+                equal_q &= Q(**{f"{name}__isnull": True})
+            else:
+                after_q = Q(**{f"{name}__{lookup}": value}) | Q(**{f"{name}__isnull": True})
+                keyset_q |= equal_q & after_q
+                equal_q &= Q(**{name: value})
+        return keyset_q
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.model is None:
+            self.model = queryset.model
+        self.prepare(request)
+        queryset = queryset.filter(self.get_keyset_q()).order_by(*self.get_order_by())
+        return self.finalize(list(queryset[:self.page_size + 1]))
+
+    def finalize(self, rows):
+        """
+        Cuts the look-ahead row off a fetched page and remembers the next cursor.
+        Expects page_size + 1 rows in the requested ordering.
+        """
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, "page")
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
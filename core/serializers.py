@@ -0,0 +1,88 @@
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+
+def use_compiled_serializers():
+    """
+    Returns True if list endpoints should render with compiled read serializers.
+    """
+    return getattr(settings, "COMPILED_READ_SERIALIZERS", False)
+
+
+class CompiledReadSerializer:
+    """
+    Read-only serializer for list endpoints that renders plain `.values()` row dicts.
+    Each entry of `fields` is a tuple (output name, values lookup, converter):
+    - converter None: the value is emitted as is
+    - converter is a DRF field: its to_representation() is used (None stays None)
+    - converter is a string: the named method is called with the whole row
+    The accessors are built once per serializer, not once per row and field.
+    """
+    fields = ()
+
+    # Lookups only read by method converters
+    extra_lookups = ()
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+        self.accessors = [
+            (name, self.compile_accessor(lookup, converter))
+            for name, lookup, converter in self.fields
+        ]
+
+    @classmethod
+    def value_lookups(cls):
+        """
+        Returns the lookups to pass to `.values()` for this serializer.
+        """
+        lookups = [lookup for _, lookup, _ in cls.fields if lookup]
+        lookups += list(cls.extra_lookups)
+        return list(dict.fromkeys(lookups))
+
+    def compile_accessor(self, lookup, converter):
+        if isinstance(converter, str):
+            return getattr(self, converter)
+        if converter is None:
+            return itemgetter(lookup)
+        to_representation = converter.to_representation
+
+        def accessor(row):
+            value = row[lookup]
+            return None if value is None else to_representation(value)
+        return accessor
+
+    def file_url(self, name):
+        """
+        Mirrors FileField.to_representation for a stored file name.
+        """
+        if not name:
+            return None
+        url = default_storage.url(name)
+        request = self.context.get("request")
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def prepare(self, rows):
+        """
+        Hook to batch-load related data for all rows before rendering.
+        """
+
+    def to_representation(self, row):
+        return {name: accessor(row) for name, accessor in self.accessors}
+
+    @property
+    def data(self):
+        rows = list(self.rows)
+        self.prepare(rows)
+        return [self.to_representation(row) for row in rows]
+
+
+# Shared converters matching the output of the regular ModelSerializers
+DATETIME = serializers.DateTimeField()
+PRICE = serializers.DecimalField(max_digits=10, decimal_places=0)
+PRICE_2_PLACES = serializers.DecimalField(max_digits=10, decimal_places=2)
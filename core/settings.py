@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     'offers_app',
     'orders_app',
     'reviews_app',
+    'notifications_app',
 
 ]
 
@@ -149,3 +150,66 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
     "DATETIME_FORMAT": "%Y-%m-%dT%H:%M:%SZ",
 }
+
+# Pagination mode of GET /api/offers/ when the client does not pass ?pagination=
+# ('page' keeps the page-number response, 'cursor' uses keyset pagination)
+OFFERS_PAGINATION = "page"
+
+# Seconds a cached page of GET /api/offers/ is kept (pages are also
+# invalidated immediately on every offer write)
+OFFERS_LIST_CACHE_TIMEOUT = 300
+
+# Render list endpoints with compiled read serializers (core.serializers)
+# that emit the same JSON from .values() rows without DRF field overhead
+COMPILED_READ_SERIALIZERS = False
+
+# POST /api/offers/bulk/: offers validated and inserted per transaction,
+# and the maximum number of offers accepted per request
+OFFERS_BULK_CHUNK_SIZE = 100
+OFFERS_BULK_MAX_ITEMS = 1000
+
+# Pagination mode of GET /api/orders/ when the client does not pass ?pagination=
+# ('list' returns the full unpaginated list, 'cursor' uses keyset pagination)
+ORDERS_PAGINATION = "list"
+
+# Maximum number of business_ids accepted by GET /api/order-stats/
+ORDER_STATS_MAX_IDS = 100
+
+# Maximum number of order_ids accepted by POST /api/orders/bulk-status/
+ORDER_BULK_STATUS_MAX_IDS = 500
+
+# Seconds an Idempotency-Key of POST /api/orders/ is remembered
+ORDER_IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+# Handlers the outbox worker calls per event topic (dotted paths).
+# Also available: notifications_app.handlers.send_email and
+# notifications_app.handlers.post_webhook (uses OUTBOX_WEBHOOK_URL)
+OUTBOX_HANDLERS = {
+    "order.created": ["notifications_app.handlers.notify_in_app"],
+    "order.status_changed": ["notifications_app.handlers.notify_in_app"],
+    "review.created": ["notifications_app.handlers.notify_in_app"],
+}
+
+# URL the post_webhook outbox handler sends events to
+OUTBOX_WEBHOOK_URL = None
+
+# Failed dispatch attempts after which an outbox event is no longer retried
+OUTBOX_MAX_ATTEMPTS = 10
+
+# Seconds an outbox worker may hold claimed events before others can retry them
+OUTBOX_LEASE_SECONDS = 300
+
+# Age in days after which closed orders are moved to the archive table
+ORDER_ARCHIVE_AFTER_DAYS = 365
+
+# Rows fetched per database round trip by GET /api/orders/export/
+ORDER_EXPORT_CHUNK_SIZE = 2000
+
+# Maximum number of business_ids accepted by GET /api/reviews/summary/
+REVIEW_SUMMARY_MAX_IDS = 100
+
+# Seconds the cached snapshot of GET /api/base-info/ stays fresh
+BASE_INFO_CACHE_TIMEOUT = 60
+
+# Default pagination of GET /api/reviews/: "list" (all reviews) or "cursor"
+REVIEWS_PAGINATION = "list"
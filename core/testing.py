@@ -0,0 +1,135 @@
+import base64
+import json
+import os
+import re
+import statistics
+import time
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from auth_app.models import UserProfile
+from offers_app.models import Offer, OfferDetail
+
+
+# Cache settings for tests that must not see cached responses
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+# Cache settings for tests of the cache itself
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Benchmarks only run with RUN_BENCHMARKS=1, as they seed large datasets;
+# BENCHMARK_SCALE multiplies their dataset sizes (e.g. 0.01 for a quick run)
+benchmark = unittest.skipUnless(
+    os.environ.get("RUN_BENCHMARKS"), "Set RUN_BENCHMARKS=1 to run benchmarks.")
+
+
+def benchmark_size(default):
+    """
+    Returns the dataset size of a benchmark, scaled by BENCHMARK_SCALE.
+    """
+    return max(1, int(default * float(os.environ.get("BENCHMARK_SCALE", 1))))
+
+
+def measure(func, repeat=5):
+    """
+    Calls func repeat times and returns the median duration in seconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started_at)
+    return statistics.median(durations)
+
+
+def report_rows_per_second(label, row_count, renders):
+    """
+    Measures each render callable of a {name: callable} dict, prints its
+    throughput and returns the rows per second by name.
+    """
+    rates = {name: row_count / measure(render) for name, render in renders.items()}
+    print(f"\n{label} ({row_count} rows): " + ", ".join(
+        f"{name} {rate:,.0f} rows/s" for name, rate in rates.items()))
+    return rates
+
+
+class QueryPlanMixin:
+    """
+    Assertions on the database's query plan (EXPLAIN) for TestCases.
+    On PostgreSQL, sequential scans are disabled while explaining, so the
+    plan shows whether an index can serve the query even on tiny test tables.
+    """
+    # Plan lines of an explicit sort step (SQLite, PostgreSQL)
+    sort_pattern = re.compile(r"USE TEMP B-TREE FOR ORDER BY|^\s*(->\s*)?(Incremental )?Sort\b", re.M)
+
+    def get_plan(self, queryset):
+        if connection.vendor != "postgresql":
+            return queryset.explain()
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+
+    def assertUsesIndex(self, queryset, *index_names, ordered=False):
+        """
+        Asserts that the plan uses one of the given indexes and, with
+        ordered=True, that the index order is used instead of a sort step.
+        """
+        plan = self.get_plan(queryset)
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f"None of {index_names} used:\n{plan}")
+        if ordered:
+            self.assertIsNone(self.sort_pattern.search(plan), f"Sort step in plan:\n{plan}")
+        return plan
+
+
+def create_user(username, type_, **profile):
+    """
+    Creates a user with a profile of the given type and returns the user
+    and an API client authenticated with the user's token.
+    """
+    user = User.objects.create_user(
+        username=username, password="pw12345678", email=f"{username}@example.com")
+    UserProfile.objects.create(
+        user=user, type=type_, first_name=username.title(), **profile)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Token " + Token.objects.create(user=user).key)
+    return user, client
+
+
+def offer_payload(title, base_price=100):
+    """
+    Returns a POST /api/offers/ payload with basic, standard and premium details.
+    """
+    return {
+        "title": title,
+        "description": f"{title} description",
+        "details": [
+            {"title": offer_type, "revisions": i, "delivery_time_in_days": 7 - i,
+             "price": base_price * i, "features": ["Logo"], "offer_type": offer_type}
+            for i, offer_type in enumerate(("basic", "standard", "premium"), start=1)
+        ],
+    }
+
+
+def create_offer_detail(business_user, price=100):
+    """
+    Creates an offer of the business user with a single basic detail.
+    """
+    offer = Offer.objects.create(
+        user=business_user, title="Logo", description="Logo design")
+    return OfferDetail.objects.create(
+        offer=offer, title="Basic", revisions=1, delivery_time_in_days=5,
+        price=price, features=["Logo"], offer_type="basic")
+
+
+def encode_cursor(values):
+    """
+    Encodes cursor values the way KeysetPagination does, for crafted cursors.
+    """
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
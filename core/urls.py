@@ -40,5 +40,8 @@ urlpatterns = [
 
         # Routes for review system and public metrics
         path('', include('reviews_app.api.urls')),
+
+        # Routes for the in-app notification feed
+        path('', include('notifications_app.api.urls')),
     ])),
 ]
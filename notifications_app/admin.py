@@ -0,0 +1,15 @@
+from django.contrib import admin
+from notifications_app.models import OutboxEvent, Notification
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "topic", "created_at", "processed_at", "attempts")
+    list_filter = ("topic",)
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "topic", "created_at", "read_at")
+    list_filter = ("topic",)
+    search_fields = ("user__username",)
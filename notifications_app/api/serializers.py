@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from notifications_app.models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """
+    Serializer for entries of the in-app notification feed.
+    """
+    class Meta:
+        model = Notification
+        fields = ["id", "topic", "payload", "created_at", "read_at"]
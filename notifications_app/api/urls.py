@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import NotificationListView
+
+# URL patterns for the in-app notification feed
+urlpatterns = [
+    # Endpoint to list the notifications of the logged-in user
+    path("notifications/", NotificationListView.as_view(), name="notifications"),
+]
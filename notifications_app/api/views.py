@@ -0,0 +1,36 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.authentication import TokenAuthentication
+from core.pagination import KeysetPagination
+from notifications_app.models import Notification
+from .serializers import NotificationSerializer
+
+
+class NotificationCursorPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+
+
+class NotificationListView(APIView):
+    """
+    API view returning the in-app notification feed of the logged-in user,
+    newest first and cursor-paginated.
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Returns a page of notifications.
+        Query params:
+        - unread=1: only notifications that were not read yet
+        - cursor, page_size: keyset pagination
+        """
+        queryset = Notification.objects.filter(user=request.user)
+        if request.query_params.get("unread") in ("1", "true"):
+            queryset = queryset.filter(read_at__isnull=True)
+
+        paginator = NotificationCursorPagination(ordering=("-created_at", "-id"))
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = NotificationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,55 @@
+import json
+import urllib.request
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import send_mail
+
+from notifications_app.models import Notification
+
+
+def notify_in_app(event):
+    """
+    Adds the event to the in-app feed of the user in payload['recipient_id'].
+    """
+    recipient_id = event.payload.get("recipient_id")
+    if recipient_id is None:
+        return
+    Notification.objects.create(
+        user_id=recipient_id, topic=event.topic, payload=event.payload)
+
+
+def send_email(event):
+    """
+    Sends a short email about the event to the recipient's address.
+    """
+    recipient_id = event.payload.get("recipient_id")
+    email = User.objects.filter(id=recipient_id).values_list(
+        "email", flat=True).first()
+    if not email:
+        return
+    send_mail(
+        subject=f"Coderr: {event.topic}",
+        message=json.dumps(event.payload, indent=2),
+        from_email=None,
+        recipient_list=[email],
+    )
+
+
+def post_webhook(event):
+    """
+    POSTs the event as JSON to OUTBOX_WEBHOOK_URL. Does nothing if it is unset.
+    """
+    url = getattr(settings, "OUTBOX_WEBHOOK_URL", None)
+    if not url:
+        return
+    body = json.dumps({
+        "id": event.id,
+        "topic": event.topic,
+        "payload": event.payload,
+        "created_at": event.created_at.isoformat(),
+    }).encode()
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request, timeout=10) as response:
+        response.read()
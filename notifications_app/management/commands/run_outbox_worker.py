@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from notifications_app.outbox import process_batch
+
+
+class Command(BaseCommand):
+    """
+    Dispatches pending outbox events to their handlers in batches.
+    """
+    help = "Dispatches pending outbox events to their handlers in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=100,
+            help="Number of events dispatched per transaction.")
+        parser.add_argument(
+            "--interval", type=float, default=1.0,
+            help="Seconds to sleep when no events are pending.")
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Drain the pending events once and exit.")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            handled = process_batch(options["batch_size"])
+            total += handled
+            if handled:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Dispatched {total} events."))
@@ -0,0 +1,71 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """
+    Domain event written in the same transaction as the change it describes.
+    The run_outbox_worker command dispatches pending events to the handlers
+    configured in OUTBOX_HANDLERS, outside of the request path.
+    """
+
+    # Event name, e.g. order.created
+    topic = models.CharField(max_length=100)
+
+    # JSON data of the event
+    payload = models.JSONField(default=dict)
+
+    # Timestamp when the event was written
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Earliest time the worker may (re)try the event
+    available_at = models.DateTimeField(default=timezone.now)
+
+    # End of the lease of the worker currently dispatching the event
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    # Timestamp when all handlers succeeded (null while pending)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    # Number of failed dispatch attempts
+    attempts = models.IntegerField(default=0)
+
+    # Error message of the last failed attempt
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta:
+        # Index for the worker's scan over pending events
+        indexes = [
+            models.Index(fields=["processed_at", "available_at"],
+                         name="outbox_pending_idx"),
+        ]
+
+
+class Notification(models.Model):
+    """
+    Entry of a user's in-app notification feed.
+    """
+
+    # The user who receives the notification
+    user = models.ForeignKey(
+        User, related_name="notifications", on_delete=models.CASCADE
+    )
+
+    # Topic of the event that caused the notification
+    topic = models.CharField(max_length=100)
+
+    # JSON data of the event
+    payload = models.JSONField(default=dict)
+
+    # Timestamp when the notification was created
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Timestamp when the user read the notification (null while unread)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at"],
+                         name="notification_user_created_idx"),
+        ]
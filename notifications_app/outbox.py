@@ -0,0 +1,117 @@
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from notifications_app.models import OutboxEvent
+
+
+def publish(topic, payload):
+    """
+    Writes an event to the outbox. Must be called inside the transaction of
+    the change it describes, so the event exists exactly if the change commits.
+    """
+    return OutboxEvent.objects.create(topic=topic, payload=payload)
+
+
+def publish_many(topic, payloads):
+    """
+    Writes one event per payload with a single INSERT.
+    """
+    return OutboxEvent.objects.bulk_create(
+        [OutboxEvent(topic=topic, payload=payload) for payload in payloads]
+    )
+
+
+@lru_cache(maxsize=None)
+def _import_handler(path):
+    return import_string(path)
+
+
+def get_handlers(topic):
+    """
+    Returns the handler callables configured for a topic in OUTBOX_HANDLERS.
+    """
+    paths = getattr(settings, "OUTBOX_HANDLERS", {}).get(topic, ())
+    return [_import_handler(path) for path in paths]
+
+
+def _retry_delay(attempts):
+    # Exponential backoff: 30s, 60s, 120s, ... capped at one hour
+    return timedelta(seconds=min(30 * 2 ** (attempts - 1), 3600))
+
+
+def get_lease_duration():
+    return timedelta(seconds=getattr(settings, "OUTBOX_LEASE_SECONDS", 300))
+
+
+def claim_batch(batch_size=100):
+    """
+    Leases up to batch_size pending events to the calling worker and returns them.
+    Only this short transaction holds row locks (SKIP LOCKED where supported);
+    a worker that dies leaves the events to others once the lease expires.
+    """
+    max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 10)
+    now = timezone.now()
+
+    with transaction.atomic():
+        queryset = OutboxEvent.objects.filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lte=now),
+            processed_at__isnull=True,
+            available_at__lte=now,
+            attempts__lt=max_attempts,
+        ).order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        ids = list(queryset.values_list("id", flat=True)[:batch_size])
+        OutboxEvent.objects.filter(id__in=ids).update(
+            locked_until=now + get_lease_duration())
+    return list(OutboxEvent.objects.filter(id__in=ids).order_by("id"))
+
+
+def dispatch(event):
+    """
+    Runs the handlers of an event. Returns None on success or the error message.
+    """
+    try:
+        # Rolls back the database writes of the handlers if one of them fails
+        with transaction.atomic():
+            for handler in get_handlers(event.topic):
+                handler(event)
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+    return None
+
+
+def process_batch(batch_size=100):
+    """
+    Dispatches up to batch_size pending events and returns how many were handled.
+    Events are claimed first, handlers run outside of any transaction holding
+    their rows, and the results are written in a short follow-up transaction.
+    Handlers must be idempotent: an event whose lease expires before its
+    result is recorded is dispatched again.
+    """
+    events = claim_batch(batch_size)
+    if not events:
+        return 0
+
+    for event in events:
+        error = dispatch(event)
+        finished_at = timezone.now()
+        if error is None:
+            event.processed_at = finished_at
+        else:
+            event.attempts += 1
+            event.last_error = error
+            event.available_at = finished_at + _retry_delay(event.attempts)
+        event.locked_until = None
+
+    with transaction.atomic():
+        OutboxEvent.objects.bulk_update(
+            events,
+            ["processed_at", "attempts", "last_error", "available_at", "locked_until"])
+    return len(events)
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.testing import NO_CACHE, create_offer_detail, create_user
+from notifications_app.models import OutboxEvent
+from notifications_app.outbox import claim_batch, process_batch, publish
+
+
+# Events seen by recording_handler
+handled_events = []
+
+
+def recording_handler(event):
+    handled_events.append(event.payload)
+
+
+def failing_handler(event):
+    raise RuntimeError("handler failed")
+
+
+@override_settings(CACHES=NO_CACHE, OUTBOX_HANDLERS={})
+class OutboxTests(TestCase):
+    """
+    Tests for leasing and dispatching outbox events.
+    """
+
+    def test_claimed_events_are_leased(self):
+        for i in range(3):
+            publish("test.event", {"i": i})
+        self.assertEqual([event.payload["i"] for event in claim_batch(2)], [0, 1])
+        self.assertEqual([event.payload["i"] for event in claim_batch(5)], [2])
+        self.assertEqual(claim_batch(5), [])
+
+    @override_settings(
+        OUTBOX_HANDLERS={"test.event": ["notifications_app.tests.recording_handler"]})
+    def test_handled_event_is_marked_processed(self):
+        handled_events.clear()
+        publish("test.event", {"i": 1})
+        self.assertEqual(process_batch(), 1)
+        self.assertEqual(handled_events, [{"i": 1}])
+        event = OutboxEvent.objects.get()
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(event.attempts, 0)
+        self.assertEqual(process_batch(), 0)
+
+    def test_order_creation_publishes_an_event(self):
+        business, _ = create_user("business", "business")
+        _, client = create_user("customer", "customer")
+        detail = create_offer_detail(business)
+        response = client.post("/api/orders/", {"offer_detail_id": detail.id}, format="json")
+        event = OutboxEvent.objects.get(topic="order.created")
+        self.assertEqual(event.payload["order_id"], response.json()["id"])
+        self.assertEqual(event.payload["recipient_id"], business.id)
+
+    def test_expired_lease_is_claimed_again(self):
+        publish("test.event", {})
+        event = claim_batch()[0]
+        OutboxEvent.objects.filter(id=event.id).update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(process_batch(), 1)
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+        self.assertIsNone(event.locked_until)
+
+    @override_settings(OUTBOX_HANDLERS={"test.event": ["notifications_app.tests.failing_handler"]})
+    def test_failed_event_is_retried_later(self):
+        publish("test.event", {})
+        self.assertEqual(process_batch(), 1)
+        event = OutboxEvent.objects.get()
+        self.assertIsNone(event.processed_at)
+        self.assertIsNone(event.locked_until)
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.last_error, "RuntimeError: handler failed")
+        self.assertGreater(event.available_at, timezone.now())
+        # Not available again until the retry delay has passed
+        self.assertEqual(process_batch(), 0)
@@ -4,7 +4,7 @@ from offers_app.models import Offer, OfferDetail
 
 @admin.register(Offer)
 class OfferAdmin(admin.ModelAdmin):
-    list_display = ("title", "user", "min_price",
+    list_display = ("title", "user", "min_price", "max_price",
                     "min_delivery_time", "created_at")
     search_fields = ("title", "user__username")
     list_filter = ("created_at",)
@@ -16,3 +16,18 @@ class OfferDetailAdmin(admin.ModelAdmin):
                     "delivery_time_in_days", "offer_type")
     search_fields = ("title",)
     list_filter = ("offer_type",)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        obj.offer.refresh_detail_summary()
+
+    def delete_model(self, request, obj):
+        offer = obj.offer
+        super().delete_model(request, obj)
+        offer.refresh_detail_summary()
+
+    def delete_queryset(self, request, queryset):
+        offers = list(Offer.objects.filter(details__in=queryset).distinct())
+        super().delete_queryset(request, queryset)
+        for offer in offers:
+            offer.refresh_detail_summary()
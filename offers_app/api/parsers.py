@@ -0,0 +1,29 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON (one object per line) lazily.
+    Returns a generator, so large uploads are never loaded as a whole.
+    Lines that are not valid JSON are yielded as ParseError instances,
+    so the view can report them per item instead of failing the whole request.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return self._iter_items(stream)
+
+    def _iter_items(self, stream):
+        if stream is None:
+            return
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield ParseError(f"NDJSON parse error - {exc}")
@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.utils import timezone
 from offers_app.models import OfferDetail, Offer
-from django.db.models import Min
+from core.serializers import CompiledReadSerializer, DATETIME, PRICE
 
 
 class OfferDetailListSerializer(serializers.ModelSerializer):
@@ -53,6 +55,37 @@ class OfferGetSerializer(serializers.ModelSerializer):
         }
 
 
+def business_stats(review_count, rating_count, rating_sum, completed_order_count):
+    """
+    Returns the business_stats object of an offer from the annotations
+    added by OfferQuerySet.with_business_stats().
+    """
+    return {
+        "average_rating": round(rating_sum / rating_count, 1) if rating_count else None,
+        "review_count": review_count or 0,
+        "completed_order_count": completed_order_count or 0,
+    }
+
+
+class OfferGetExpandedSerializer(OfferGetSerializer):
+    """
+    OfferGetSerializer plus the creator's business_stats (?expand=business_stats).
+    Expects offers annotated by OfferQuerySet.with_business_stats().
+    """
+    business_stats = serializers.SerializerMethodField()
+
+    class Meta(OfferGetSerializer.Meta):
+        fields = OfferGetSerializer.Meta.fields + ["business_stats"]
+
+    def get_business_stats(self, obj):
+        return business_stats(
+            obj.business_review_count,
+            obj.business_rating_count,
+            obj.business_rating_sum,
+            obj.business_completed_order_count,
+        )
+
+
 class OfferDetailPostSerializer(serializers.ModelSerializer):
     """
     Serializer used for creating or editing individual OfferDetail entries.
@@ -66,7 +99,7 @@ class OfferDetailPostSerializer(serializers.ModelSerializer):
 class OfferPostSerializer(serializers.ModelSerializer):
     """
     Serializer for creating an Offer with multiple OfferDetail entries.
-    Calculates min_price and min_delivery_time based on provided details.
+    Calculates min_price, max_price and min_delivery_time based on provided details.
     """
     details = OfferDetailPostSerializer(many=True)
 
@@ -74,25 +107,20 @@ class OfferPostSerializer(serializers.ModelSerializer):
         model = Offer
         fields = ['id', 'title', 'image', 'description', 'details']
 
+    @transaction.atomic
     def create(self, validated_data):
         details_data = validated_data.pop("details")
 
-        # Calculate minimum price and delivery time across details
-        min_price = min(detail["price"] for detail in details_data)
-        min_delivery_time = min(detail["delivery_time_in_days"]
-                                for detail in details_data)
-
-        # Create the offer instance
+        # Create the offer instance with price and delivery time summary
         offer = Offer.objects.create(
             user=self.context["request"].user,
-            min_price=min_price,
-            min_delivery_time=min_delivery_time,
+            **Offer.detail_summary(details_data),
             **validated_data
         )
 
-        # Create all associated details
-        for detail in details_data:
-            OfferDetail.objects.create(offer=offer, **detail)
+        # Create all associated details in a single INSERT
+        OfferDetail.objects.bulk_create(
+            [OfferDetail(offer=offer, **detail) for detail in details_data])
 
         return offer
 
@@ -117,12 +145,11 @@ class OfferDetailSimpleSerializer(serializers.ModelSerializer):
 
 class OfferGetDetailSerializer(serializers.ModelSerializer):
     """
-    Full detail view serializer for a single Offer, including dynamically calculated
+    Full detail view serializer for a single Offer, including the stored
     min_price and min_delivery_time, and a nested list of associated details.
     """
     details = OfferDetailSimpleSerializer(many=True, read_only=True)
-    min_price = serializers.SerializerMethodField()
-    min_delivery_time = serializers.SerializerMethodField()
+    min_price = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Offer
@@ -132,18 +159,6 @@ class OfferGetDetailSerializer(serializers.ModelSerializer):
             'details', 'min_price', 'min_delivery_time'
         ]
 
-    def get_min_price(self, obj):
-        """
-        Returns the minimum price from all associated offer details.
-        """
-        return int(obj.details.aggregate(Min('price'))['price__min'])
-
-    def get_min_delivery_time(self, obj):
-        """
-        Returns the minimum delivery time from all associated offer details.
-        """
-        return obj.details.aggregate(Min('delivery_time_in_days'))['delivery_time_in_days__min']
-
 
 class OfferDetailNestedSerializer(serializers.ModelSerializer):
     """
@@ -165,7 +180,8 @@ class OfferDetailNestedSerializer(serializers.ModelSerializer):
 class OfferPatchDetailSerializer(serializers.ModelSerializer):
     """
     Serializer for patching an offer and selectively updating associated details.
-    Only updates matching OfferDetail entries based on offer_type.
+    Details are matched by offer_type; changed ones are written with one bulk UPDATE,
+    new ones with one bulk INSERT, all in a single transaction.
     """
     details = OfferDetailPostSerializer(many=True, required=False)
 
@@ -179,26 +195,59 @@ class OfferPatchDetailSerializer(serializers.ModelSerializer):
             "details"
         ]
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         details_data = validated_data.pop("details", None)
 
         # Update main Offer fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
 
-        # Conditionally update or create matching OfferDetails
+        # Diff the submitted details against the stored ones by offer_type
         if details_data is not None:
+            details = {
+                detail.offer_type: detail for detail in instance.details.all()}
+            changed = {}
+            created = []
+            changed_fields = set()
+            now = timezone.now()
+
             for detail_data in details_data:
                 offer_type = detail_data.get("offer_type")
                 if not offer_type:
                     continue
-                detail_instance, created = OfferDetail.objects.update_or_create(
-                    offer=instance,
-                    offer_type=offer_type,
-                    defaults=detail_data
-                )
+                detail = details.get(offer_type)
+                if detail is None:
+                    detail = OfferDetail(offer=instance, **detail_data)
+                    details[offer_type] = detail
+                    created.append(detail)
+                    continue
+                fields = [field for field, value in detail_data.items()
+                          if getattr(detail, field) != value]
+                for field in fields:
+                    setattr(detail, field, detail_data[field])
+                if fields and detail.pk is not None:
+                    detail.updated_at = now
+                    changed[detail.pk] = detail
+                    changed_fields.update(fields)
+
+            # One UPDATE for all changed details, one INSERT for all new ones
+            if changed:
+                OfferDetail.objects.bulk_update(
+                    changed.values(), [*changed_fields, "updated_at"])
+            if created:
+                OfferDetail.objects.bulk_create(created)
+
+            # Keep the denormalized price and delivery time columns in sync
+            summary = Offer.detail_summary([
+                {"price": detail.price,
+                 "delivery_time_in_days": detail.delivery_time_in_days}
+                for detail in details.values()
+            ])
+            for attr, value in summary.items():
+                setattr(instance, attr, value)
 
+        instance.save()
         return instance
 
 
@@ -217,3 +266,82 @@ class OfferDetailOneSerializer(serializers.ModelSerializer):
             "features",
             "offer_type"
         ]
+
+
+class OfferGetCompiledSerializer(CompiledReadSerializer):
+    """
+    Compiled read serializer producing the same output as OfferGetSerializer
+    from `.values()` rows. Detail ids are loaded for the whole page in one query.
+    """
+    fields = (
+        ("id", "id", None),
+        ("user", "user", None),
+        ("title", "title", None),
+        ("image", "image", "get_image"),
+        ("description", "description", None),
+        ("created_at", "created_at", DATETIME),
+        ("updated_at", "updated_at", DATETIME),
+        ("details", None, "get_details"),
+        ("min_price", "min_price", PRICE),
+        ("min_delivery_time", "min_delivery_time", None),
+        ("user_details", None, "get_user_details"),
+    )
+    extra_lookups = (
+        "user__username",
+        "user__profile__id",
+        "user__profile__first_name",
+        "user__profile__last_name",
+    )
+
+    def prepare(self, rows):
+        self.detail_ids = {}
+        detail_rows = OfferDetail.objects.filter(
+            offer_id__in=[row["id"] for row in rows]
+        ).order_by("id").values_list("offer_id", "id")
+        for offer_id, detail_id in detail_rows:
+            self.detail_ids.setdefault(offer_id, []).append(detail_id)
+
+    def get_image(self, row):
+        return self.file_url(row["image"])
+
+    def get_details(self, row):
+        request = self.context.get("request")
+        details = []
+        for detail_id in self.detail_ids.get(row["id"], []):
+            url = f"/api/offerdetails/{detail_id}/"
+            if request:
+                url = request.build_absolute_uri(url)
+            details.append({"id": detail_id, "url": url})
+        return details
+
+    def get_user_details(self, row):
+        if row["user__profile__id"] is None:
+            return {}
+        return {
+            "first_name": row["user__profile__first_name"] or "",
+            "last_name": row["user__profile__last_name"] or "",
+            "username": row["user__username"] or ""
+        }
+
+
+class OfferGetExpandedCompiledSerializer(OfferGetCompiledSerializer):
+    """
+    Compiled counterpart of OfferGetExpandedSerializer.
+    """
+    fields = OfferGetCompiledSerializer.fields + (
+        ("business_stats", None, "get_business_stats"),
+    )
+    extra_lookups = OfferGetCompiledSerializer.extra_lookups + (
+        "business_review_count",
+        "business_rating_count",
+        "business_rating_sum",
+        "business_completed_order_count",
+    )
+
+    def get_business_stats(self, row):
+        return business_stats(
+            row["business_review_count"],
+            row["business_rating_count"],
+            row["business_rating_sum"],
+            row["business_completed_order_count"],
+        )
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import OfferDetailView, OfferDetailOneView, OfferView
+from .views import OfferDetailView, OfferDetailOneView, OfferView, OfferBulkView
 from rest_framework.routers import DefaultRouter
 
 # Custom API endpoints for offer-related operations
@@ -13,6 +13,9 @@ custom_urls = [
 
     # Endpoint for listing all offers or creating a new one
     path("offers/", OfferView.as_view(), name="offer-list"),
+
+    # Endpoint for importing many offers at once (JSON array or NDJSON)
+    path("offers/bulk/", OfferBulkView.as_view(), name="offer-bulk"),
 ]
 
 # Default router (currently unused but included for future extensibility)
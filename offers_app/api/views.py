@@ -1,23 +1,39 @@
-from .serializers import OfferPostSerializer, OfferGetSerializer
+from .serializers import OfferPostSerializer, OfferGetSerializer, OfferGetCompiledSerializer, OfferGetExpandedSerializer, OfferGetExpandedCompiledSerializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from offers_app.models import Offer, OfferDetail
 from django_filters.rest_framework import FilterSet, NumberFilter
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.pagination import PageNumberPagination
 from offers_app.api.serializers import OfferGetDetailSerializer, OfferDetailOneSerializer, OfferPatchDetailSerializer
+from offers_app.search import search_offers
+from core.pagination import KeysetPagination, get_pagination_mode
+from core.serializers import use_compiled_serializers
+from core.conditional import conditional_get
+from rest_framework.parsers import JSONParser
+from rest_framework.exceptions import ParseError
+from offers_app.api.parsers import NDJSONParser
+from itertools import islice
+import time
+from django.conf import settings
+from django.core.cache import cache
+from offers_app.cache import (
+    offer_list_cache_key,
+    get_list_cache_timeout,
+    record_hit,
+    record_miss,
+)
 
 
 class OfferFilter(FilterSet):
     """
     FilterSet for filtering offers based on price, delivery time, and creator ID.
     """
-    min_price = NumberFilter(field_name='details__price', lookup_expr='gte')
+    min_price = NumberFilter(field_name='max_price', lookup_expr='gte')
     max_delivery_time = NumberFilter(
-        field_name='details__delivery_time_in_days', lookup_expr='lte')
+        field_name='min_delivery_time', lookup_expr='lte')
     creator_id = NumberFilter(field_name='user_id', lookup_expr='exact')
 
 
@@ -26,6 +42,24 @@ class CustomPageNumberPagination(PageNumberPagination):
     max_page_size = 10
 
 
+# Whitelisted ?ordering= values, each with the primary key as tiebreaker
+# and backed by a matching index on Offer
+OFFER_ORDERINGS = {
+    "updated_at": ("updated_at", "id"),
+    "-updated_at": ("-updated_at", "-id"),
+    "created_at": ("created_at", "id"),
+    "-created_at": ("-created_at", "-id"),
+    "min_price": ("min_price", "id"),
+    "-min_price": ("-min_price", "-id"),
+    "min_delivery_time": ("min_delivery_time", "id"),
+    "-min_delivery_time": ("-min_delivery_time", "-id"),
+}
+
+
+# Allowed values of ?expand= on the offer list
+OFFER_LIST_EXPANSIONS = {"business_stats"}
+
+
 class OfferView(APIView):
     """
     API view for listing and creating offers.
@@ -34,60 +68,135 @@ class OfferView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
+        """
+        Returns the offer list from the response cache if possible.
+        Cached pages are versioned and disappear as soon as any offer changes.
+        """
+        cache_key = offer_list_cache_key(request)
+        data = cache.get(cache_key)
+        if data is not None:
+            record_hit()
+            return Response(data, status=200, headers={"X-Cache": "HIT"})
+
+        record_miss()
+        response = self.list_offers(request)
+        if response.status_code == 200:
+            cache.set(cache_key, response.data, get_list_cache_timeout())
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list_offers(self, request):
         """
         Retrieves a list of offers with optional filtering, searching, and ordering.
         Supports:
         - creator_id: Filter by creator's user ID
         - min_price: Minimum offer detail price
         - max_delivery_time: Maximum delivery time in days
-        - search: Case-insensitive title or description match
-        - ordering: Sort results (default: updated_at descending)
+        - search: Full-text match on title or description
+        - ordering: updated_at, created_at, min_price or min_delivery_time,
+          '-' prefix for descending (default: -updated_at, or relevance when searching)
+        - pagination: 'page' (default) or 'cursor' for keyset pagination
+        - expand=business_stats: Add the creator's average rating, review count
+          and completed-order count to each offer (may lag behind by up to
+          OFFERS_LIST_CACHE_TIMEOUT, as pages are only versioned on offer changes)
         """
-        offers = Offer.objects.all()
+        compiled = use_compiled_serializers()
+
+        expand = {value for value in request.query_params.get("expand", "").split(",") if value}
+        if not expand <= OFFER_LIST_EXPANSIONS:
+            return Response({"detail": "Invalid expand value."}, status=400)
+        expand_stats = "business_stats" in expand
+        offers = Offer.objects.all() if compiled else Offer.objects.for_list()
 
         # Filter by creator ID
         creator_id = request.query_params.get("creator_id")
         if creator_id:
             offers = offers.filter(user_id=creator_id)
 
-        # Filter by minimum price
+        # Filter by minimum price: offers with at least one detail at or above it
         min_price = request.query_params.get("min_price")
         if min_price:
-            offers = offers.filter(details__price__gte=min_price)
+            offers = offers.filter(max_price__gte=min_price)
 
-        # Filter by maximum delivery time
+        # Filter by maximum delivery time: offers with at least one detail within it
         max_delivery_time = request.query_params.get("max_delivery_time")
         if max_delivery_time is not None:
             try:
                 max_days = int(max_delivery_time)
-                offers = offers.filter(
-                    details__delivery_time_in_days__lte=max_days)
+                offers = offers.filter(min_delivery_time__lte=max_days)
             except ValueError:
                 return Response(
                     {"detail": "max_delivery_time must be an integer."},
                     status=400
                 )
 
-        # Search in title or description
+        # Full-text search in title or description
         search = request.query_params.get("search")
         if search:
-            offers = offers.filter(
-                Q(title__icontains=search) | Q(description__icontains=search)
-            )
+            offers = search_offers(offers, search)
+
+        # Only whitelisted orderings; 'relevance' requires a search
+        ordering = request.query_params.get("ordering")
+        if ordering in (None, "relevance") and "search_rank" in offers.query.annotations:
+            ordering = "relevance"
+        elif ordering is None:
+            ordering = "-updated_at"
+        elif ordering not in OFFER_ORDERINGS:
+            return Response({"detail": "Invalid ordering."}, status=400)
 
-        # Ordering by specified field or default to updated_at
-        ordering = request.query_params.get("ordering", "-updated_at")
-        offers = offers.order_by(ordering)
+        if expand_stats:
+            offers = offers.with_business_stats()
+
+        # Compiled serializers render plain row dicts
+        if compiled:
+            serializer_class = self.get_list_serializer_class(expand_stats)
+            offers = offers.values(*serializer_class.value_lookups())
+
+        # Keyset pagination: no COUNT, no OFFSET
+        if get_pagination_mode(request, "OFFERS_PAGINATION", "page") == "cursor":
+            if ordering == "relevance":
+                return Response(
+                    {"detail": "Relevance ordering is not supported with cursor pagination."},
+                    status=400
+                )
+            paginator = KeysetPagination(ordering=OFFER_ORDERINGS[ordering])
+            paginated_offers = paginator.paginate_queryset(offers, request)
+            serializer = self.get_list_serializer(
+                paginated_offers, request, expand_stats)
+            return paginator.get_paginated_response(serializer.data)
+
+        # Ordering by relevance when searching, otherwise by the whitelisted field
+        if ordering == "relevance":
+            offers = offers.order_by("-search_rank", "-updated_at", "-id")
+        else:
+            offers = offers.order_by(*OFFER_ORDERINGS[ordering])
 
         # Paginate and serialize the queryset
         paginator = CustomPageNumberPagination()
-        paginated_offers = paginator.paginate_queryset(
-            offers.distinct(), request)
-        serializer = OfferGetSerializer(
-            paginated_offers, many=True, context={"request": request})
+        paginated_offers = paginator.paginate_queryset(offers, request)
+        serializer = self.get_list_serializer(
+            paginated_offers, request, expand_stats)
 
         return paginator.get_paginated_response(serializer.data)
 
+    @staticmethod
+    def get_list_serializer_class(expand_stats=False):
+        if use_compiled_serializers():
+            if expand_stats:
+                return OfferGetExpandedCompiledSerializer
+            return OfferGetCompiledSerializer
+        return OfferGetExpandedSerializer if expand_stats else OfferGetSerializer
+
+    def get_list_serializer(self, offers, request, expand_stats=False):
+        """
+        Returns the serializer for a page of offers, compiled if enabled.
+        """
+        serializer_class = self.get_list_serializer_class(expand_stats)
+        if use_compiled_serializers():
+            return serializer_class(offers, context={"request": request})
+        return serializer_class(
+            offers, many=True, context={"request": request})
+
     def post(self, request):
         """
         Creates a new offer with nested offer details.
@@ -111,6 +220,96 @@ class OfferView(APIView):
         return Response(serializer.errors, status=400)
 
 
+class OfferBulkView(APIView):
+    """
+    API view for importing many offers in one request.
+    Accepts a JSON array or an NDJSON stream (application/x-ndjson) of offers
+    in the same format as POST /api/offers/.
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request):
+        """
+        Validates the offers chunk by chunk and writes each chunk of valid offers
+        with bulk inserts in one transaction. Invalid offers are reported by index.
+        Requests with more than OFFERS_BULK_MAX_ITEMS offers are rejected with 413
+        before anything is written; the stream is not read past the limit.
+        """
+        user = request.user
+
+        # Check if user has a business profile
+        if not hasattr(user, "profile") or user.profile.type != "business":
+            return Response({"detail": "Only business users can create offers."}, status=403)
+
+        items = request.data
+        if not isinstance(items, list) and not hasattr(items, "__next__"):
+            return Response({"detail": "Expected a list of offers."}, status=400)
+
+        chunk_size = getattr(settings, "OFFERS_BULK_CHUNK_SIZE", 100)
+        max_items = getattr(settings, "OFFERS_BULK_MAX_ITEMS", 1000)
+        started = time.perf_counter()
+        created_ids = []
+        errors = []
+
+        # Read at most one offer past the limit, so oversized requests are
+        # rejected without parsing the rest of the body
+        items = list(islice(enumerate(iter(items)), max_items + 1))
+        if len(items) > max_items:
+            return Response(
+                {"detail": f"At most {max_items} offers per request."}, status=413)
+
+        items = iter(items)
+        while True:
+            chunk = list(islice(items, chunk_size))
+            if not chunk:
+                break
+
+            valid_items = []
+            for index, item in chunk:
+                if isinstance(item, ParseError):
+                    errors.append({
+                        "index": index,
+                        "errors": {"non_field_errors": [str(item.detail)]}
+                    })
+                    continue
+                serializer = OfferPostSerializer(
+                    data=item, context={"request": request})
+                if serializer.is_valid():
+                    valid_items.append(serializer.validated_data)
+                else:
+                    errors.append({"index": index, "errors": serializer.errors})
+
+            if valid_items:
+                offers = Offer.objects.bulk_create_with_details(user, valid_items)
+                created_ids.extend(offer.id for offer in offers)
+
+        elapsed = time.perf_counter() - started
+        return Response({
+            "created": len(created_ids),
+            "failed": len(errors),
+            "ids": created_ids,
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "offers_per_second": round(len(created_ids) / elapsed, 1) if elapsed else None,
+        }, status=201 if created_ids else 400)
+
+
+def offer_changed_at(pk):
+    """
+    Returns the last change timestamp of an offer for conditional requests.
+    """
+    return Offer.objects.filter(pk=pk).values_list("updated_at", flat=True).first()
+
+
+def offer_detail_changed_at(pk):
+    """
+    Returns the last change timestamp of an offer detail for conditional requests.
+    """
+    return OfferDetail.objects.filter(pk=pk).values_list("updated_at", flat=True).first()
+
+
 class OfferDetailView(APIView):
     """
     API view for retrieving, updating or deleting a specific offer.
@@ -118,9 +317,11 @@ class OfferDetailView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(offer_changed_at)
     def get(self, request, pk):
         """
         Retrieves a single offer by ID with detailed information.
+        Answers 304 if the client's ETag or Last-Modified is still current.
         """
         offer = get_object_or_404(Offer, pk=pk)
         serializer = OfferGetDetailSerializer(
@@ -176,9 +377,11 @@ class OfferDetailOneView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(offer_detail_changed_at)
     def get(self, request, pk):
         """
         Returns one specific OfferDetail object.
+        Answers 304 if the client's ETag or Last-Modified is still current.
         """
         offer_detail = get_object_or_404(OfferDetail, pk=pk)
         serializer = OfferDetailOneSerializer(
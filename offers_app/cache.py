@@ -0,0 +1,95 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import urlencode
+
+
+# Cache key holding the global offers version counter
+OFFERS_VERSION_KEY = "offers:version"
+
+# Cache keys holding the hit and miss counters of the offer list cache
+OFFERS_HITS_KEY = "offers:list:hits"
+OFFERS_MISSES_KEY = "offers:list:misses"
+
+# Query parameters that change the offer list response; all others are ignored
+OFFER_LIST_CACHE_PARAMS = (
+    "creator_id",
+    "min_price",
+    "max_delivery_time",
+    "search",
+    "ordering",
+    "page",
+    "page_size",
+    "pagination",
+    "cursor",
+    "expand",
+)
+
+
+def get_list_cache_timeout():
+    return getattr(settings, "OFFERS_LIST_CACHE_TIMEOUT", 300)
+
+
+def get_offers_version():
+    """
+    Returns the current offers version, initialising it if the cache has none.
+    The initial value is time-based so a lost counter never reuses an old version.
+    """
+    version = cache.get(OFFERS_VERSION_KEY)
+    if version is None:
+        cache.add(OFFERS_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(OFFERS_VERSION_KEY)
+    return version
+
+
+def bump_offers_version():
+    """
+    Invalidates all cached offer list pages at once by moving to a new version.
+    """
+    try:
+        cache.incr(OFFERS_VERSION_KEY)
+    except ValueError:
+        get_offers_version()
+
+
+def offer_list_cache_key(request):
+    """
+    Builds the cache key for an offer list request from the normalized query string,
+    the host (responses contain absolute URLs) and the current offers version.
+    """
+    params = sorted(
+        (name, request.query_params[name])
+        for name in OFFER_LIST_CACHE_PARAMS
+        if request.query_params.get(name)
+    )
+    raw = f"{request.scheme}://{request.get_host()}?{urlencode(params)}"
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"offers:list:v{get_offers_version()}:{digest}"
+
+
+def _increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def record_hit():
+    _increment(OFFERS_HITS_KEY)
+
+
+def record_miss():
+    _increment(OFFERS_MISSES_KEY)
+
+
+def get_cache_stats():
+    """
+    Returns the hit and miss counts of the offer list cache.
+    """
+    return {
+        "hits": cache.get(OFFERS_HITS_KEY, 0),
+        "misses": cache.get(OFFERS_MISSES_KEY, 0),
+    }
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from offers_app.cache import get_cache_stats
+
+
+class Command(BaseCommand):
+    """
+    Prints the hit and miss counts of the offer list response cache.
+    """
+    help = "Prints the hit and miss counts of the offer list response cache."
+
+    def handle(self, *args, **options):
+        stats = get_cache_stats()
+        total = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / total * 100 if total else 0.0
+        self.stdout.write(
+            f"hits: {stats['hits']}, misses: {stats['misses']}, "
+            f"hit ratio: {ratio:.1f}%"
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from offers_app.search import rebuild_index, search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the full-text search index for all offers.
+    """
+    help = "Rebuilds the full-text search index for all offers."
+
+    def handle(self, *args, **options):
+        backend = search_backend()
+        if backend is None:
+            self.stdout.write("No full-text backend for this database, nothing to do.")
+            return
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Offer search index rebuilt ({backend})."))
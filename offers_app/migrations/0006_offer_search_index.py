@@ -0,0 +1,52 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Creates the full-text index for offers: an FTS5 table on SQLite,
+    a generated tsvector column with a GIN index on PostgreSQL.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS offers_app_offer_fts "
+            "USING fts5(title, description)"
+        )
+        schema_editor.execute(
+            "INSERT INTO offers_app_offer_fts (rowid, title, description) "
+            "SELECT id, title, description FROM offers_app_offer"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE offers_app_offer ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+            ") STORED"
+        )
+        schema_editor.execute(
+            "CREATE INDEX offers_app_offer_search_vector_gin "
+            "ON offers_app_offer USING GIN (search_vector)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS offers_app_offer_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "DROP INDEX IF EXISTS offers_app_offer_search_vector_gin")
+        schema_editor.execute(
+            "ALTER TABLE offers_app_offer DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0005_alter_offer_min_price_alter_offerdetail_price'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
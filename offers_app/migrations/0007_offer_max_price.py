@@ -0,0 +1,45 @@
+# Generated by Django 5.2.2 on 2026-10-18 04:46
+
+from django.db import migrations, models
+from django.db.models import Max, Min
+
+
+def backfill_detail_summary(apps, schema_editor):
+    """
+    Recalculates min_price, max_price and min_delivery_time for all offers,
+    since patched offers may have stale values.
+    """
+    Offer = apps.get_model('offers_app', 'Offer')
+    offers = Offer.objects.annotate(
+        detail_min_price=Min('details__price'),
+        detail_max_price=Max('details__price'),
+        detail_min_delivery_time=Min('details__delivery_time_in_days'),
+    )
+    batch = []
+    for offer in offers.iterator(chunk_size=1000):
+        offer.min_price = offer.detail_min_price or 0
+        offer.max_price = offer.detail_max_price or 0
+        offer.min_delivery_time = offer.detail_min_delivery_time or 0
+        batch.append(offer)
+        if len(batch) >= 1000:
+            Offer.objects.bulk_update(
+                batch, ['min_price', 'max_price', 'min_delivery_time'])
+            batch = []
+    Offer.objects.bulk_update(
+        batch, ['min_price', 'max_price', 'min_delivery_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0006_offer_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='max_price',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=10),
+        ),
+        migrations.RunPython(backfill_detail_summary, migrations.RunPython.noop),
+    ]
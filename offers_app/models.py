@@ -1,5 +1,66 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from offers_app.cache import bump_offers_version
+from offers_app.search import index_offers
+
+
+class OfferQuerySet(models.QuerySet):
+    """
+    Custom queryset for offers with reusable query optimizations.
+    """
+
+    def for_list(self):
+        """
+        Loads everything OfferGetSerializer needs in a fixed number of queries:
+        the creator and their profile via JOIN, the detail ids via one prefetch.
+        """
+        return self.select_related("user__profile").prefetch_related(
+            models.Prefetch(
+                "details",
+                # offer_id is needed to map each detail back to its offer
+                queryset=OfferDetail.objects.only("id", "offer_id"),
+            )
+        )
+
+    def bulk_create_with_details(self, user, items):
+        """
+        Creates many validated offers (OfferPostSerializer data) with their
+        details using one INSERT for the offers and one for all details,
+        inside a single transaction. Signals are not sent by bulk_create,
+        so the search index and the offer list cache are updated explicitly.
+        """
+        offers = []
+        for item in items:
+            item = dict(item)
+            details_data = item.pop("details")
+            offer = Offer(user=user, **Offer.detail_summary(details_data), **item)
+            offer.details_data = details_data
+            offers.append(offer)
+
+        with transaction.atomic():
+            self.bulk_create(offers)
+            OfferDetail.objects.bulk_create([
+                OfferDetail(offer=offer, **detail)
+                for offer in offers
+                for detail in offer.details_data
+            ])
+            index_offers(offers)
+            transaction.on_commit(bump_offers_version)
+        return offers
+
+    def with_business_stats(self):
+        """
+        Annotates each offer with its creator's review and completed-order
+        statistics, read from the maintained summary tables via LEFT JOINs on
+        their primary keys (NULL if the creator has no reviews or orders yet).
+        """
+        return self.annotate(
+            business_review_count=models.F("user__rating_summary__review_count"),
+            business_rating_count=models.F("user__rating_summary__rating_count"),
+            business_rating_sum=models.F("user__rating_summary__rating_sum"),
+            business_completed_order_count=models.F(
+                "user__order_counter__completed_count"),
+        )
 
 
 class Offer(models.Model):
@@ -22,6 +83,9 @@ class Offer(models.Model):
     # Automatically calculated minimum price from associated OfferDetail entries
     min_price = models.DecimalField(max_digits=10, decimal_places=0, default=0)
 
+    # Automatically calculated maximum price from associated OfferDetail entries
+    max_price = models.DecimalField(max_digits=10, decimal_places=0, default=0)
+
     # Automatically calculated minimum delivery time from associated OfferDetail entries
     min_delivery_time = models.IntegerField(default=0)
 
@@ -31,6 +95,55 @@ class Offer(models.Model):
     # Timestamp when the offer was last updated
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OfferQuerySet.as_manager()
+
+    class Meta:
+        # Each supported list ordering and filter is backed by an index
+        indexes = [
+            models.Index(fields=["user", "updated_at"],
+                         name="offer_user_updated_idx"),
+            models.Index(fields=["updated_at", "id"],
+                         name="offer_updated_id_idx"),
+            models.Index(fields=["created_at", "id"],
+                         name="offer_created_id_idx"),
+            models.Index(fields=["min_price", "id"],
+                         name="offer_min_price_id_idx"),
+            models.Index(fields=["min_delivery_time", "id"],
+                         name="offer_min_delivery_id_idx"),
+            models.Index(fields=["max_price"],
+                         name="offer_max_price_idx"),
+        ]
+
+    @staticmethod
+    def detail_summary(details):
+        """
+        Returns min_price, max_price and min_delivery_time for a list of
+        detail dicts (as validated by the offer serializers).
+        """
+        if not details:
+            return {"min_price": 0, "max_price": 0, "min_delivery_time": 0}
+        prices = [detail["price"] for detail in details]
+        return {
+            "min_price": min(prices),
+            "max_price": max(prices),
+            "min_delivery_time": min(
+                detail["delivery_time_in_days"] for detail in details),
+        }
+
+    def refresh_detail_summary(self):
+        """
+        Recalculates the denormalized price and delivery time columns
+        from the stored OfferDetail entries and saves them.
+        """
+        summary = self.details.aggregate(
+            min_price=models.Min("price"),
+            max_price=models.Max("price"),
+            min_delivery_time=models.Min("delivery_time_in_days"),
+        )
+        for field, value in summary.items():
+            setattr(self, field, value or 0)
+        self.save(update_fields=[*summary, "updated_at"])
+
 
 class OfferDetail(models.Model):
     """
@@ -58,3 +171,14 @@ class OfferDetail(models.Model):
 
     # Type or label of the offer detail (e.g. "basic", "pro", "premium")
     offer_type = models.CharField(max_length=50)
+
+    # Timestamp when the offer detail was last updated
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["offer", "offer_type"],
+                         name="offerdetail_offer_type_idx"),
+            models.Index(fields=["offer", "price"],
+                         name="offerdetail_offer_price_idx"),
+        ]
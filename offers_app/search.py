@@ -0,0 +1,138 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+
+# Name of the FTS5 virtual table used on SQLite
+SQLITE_FTS_TABLE = "offers_app_offer_fts"
+
+# Name of the tsvector column and its GIN index used on PostgreSQL
+POSTGRES_VECTOR_COLUMN = "search_vector"
+POSTGRES_VECTOR_INDEX = "offers_app_offer_search_vector_gin"
+
+
+def search_backend():
+    """
+    Returns the full-text backend available for the current database
+    ('sqlite' or 'postgresql'), or None if only icontains is supported.
+    """
+    if connection.vendor in ("sqlite", "postgresql"):
+        return connection.vendor
+    return None
+
+
+def _search_terms(search):
+    """
+    Splits the raw search string into plain word tokens.
+    Operators and quotes are dropped so user input can never break the MATCH syntax.
+    """
+    return re.findall(r"\w+", search)
+
+
+def _sqlite_match_query(terms):
+    # Every term is matched as a prefix so results update on each keystroke
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _postgres_match_query(terms):
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def search_offers(queryset, search):
+    """
+    Filters an Offer queryset by a full-text search on title and description.
+    Adds a 'search_rank' annotation (higher is more relevant).
+    Words are matched by prefix ("log" finds "logo"), not as substrings
+    ("ogo" does not). Falls back to icontains on databases without a
+    full-text index.
+    """
+    terms = _search_terms(search)
+    backend = search_backend()
+
+    if backend is None or not terms:
+        return queryset.filter(
+            Q(title__icontains=search) | Q(description__icontains=search)
+        )
+
+    if backend == "sqlite":
+        match = _sqlite_match_query(terms)
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s",
+                [match],
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({SQLITE_FTS_TABLE}) FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s "
+                f"AND {SQLITE_FTS_TABLE}.rowid = offers_app_offer.id",
+                [match],
+            )
+        )
+
+    match = _postgres_match_query(terms)
+    return queryset.filter(
+        RawSQL(
+            f"offers_app_offer.{POSTGRES_VECTOR_COLUMN} @@ to_tsquery('simple', %s)",
+            [match],
+            output_field=BooleanField(),
+        )
+    ).annotate(
+        search_rank=RawSQL(
+            f"ts_rank(offers_app_offer.{POSTGRES_VECTOR_COLUMN}, "
+            f"to_tsquery('simple', %s))",
+            [match],
+        )
+    )
+
+
+def index_offers(offers):
+    """
+    Writes (or rewrites) the search index entries for the given offers.
+    Only needed on SQLite; PostgreSQL keeps its generated column up to date itself.
+    """
+    if search_backend() != "sqlite":
+        return
+    rows = [(offer.id, offer.title, offer.description) for offer in offers]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s",
+            [(row[0],) for row in rows],
+        )
+        cursor.executemany(
+            f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, title, description) "
+            f"VALUES (%s, %s, %s)",
+            rows,
+        )
+
+
+def unindex_offer(offer_id):
+    """
+    Removes the search index entry of a deleted offer.
+    """
+    if search_backend() != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s", [offer_id])
+
+
+def rebuild_index():
+    """
+    Rebuilds the complete search index from the offers table.
+    """
+    backend = search_backend()
+    with connection.cursor() as cursor:
+        if backend == "sqlite":
+            cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, title, description) "
+                f"SELECT id, title, description FROM offers_app_offer"
+            )
+        elif backend == "postgresql":
+            cursor.execute(f"REINDEX INDEX {POSTGRES_VECTOR_INDEX}")
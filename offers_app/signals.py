@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth.models import User
+from auth_app.models import UserProfile
+from offers_app.models import Offer, OfferDetail
+from offers_app.search import index_offers, unindex_offer
+from offers_app.cache import bump_offers_version
+
+
+@receiver(post_save, sender=Offer)
+def update_offer_search_index(sender, instance, **kwargs):
+    index_offers([instance])
+
+
+@receiver(post_delete, sender=Offer)
+def remove_offer_search_index(sender, instance, **kwargs):
+    unindex_offer(instance.id)
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_offer_list_cache(sender, **kwargs):
+    # Bump after commit, so no request can cache the pre-commit state
+    # under the new version
+    transaction.on_commit(bump_offers_version)
+
+
+@receiver(post_save, sender=User)
+def invalidate_offer_list_cache_on_username(sender, update_fields=None, **kwargs):
+    # The username is part of user_details; skip saves like last_login updates
+    if update_fields is not None and "username" not in update_fields:
+        return
+    transaction.on_commit(bump_offers_version)
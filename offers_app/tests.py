@@ -1,3 +1,467 @@
-from django.test import TestCase
+import random
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.testing import (
+    LOCMEM_CACHE, NO_CACHE, QueryPlanMixin, benchmark, benchmark_size, create_user, encode_cursor, measure,
+    offer_payload, report_rows_per_second,
+)
+from auth_app.models import UserProfile
+from offers_app.api.views import OFFER_ORDERINGS
+from offers_app.cache import get_cache_stats
+from offers_app.api.serializers import OfferGetCompiledSerializer, OfferGetSerializer
+from offers_app.models import Offer, OfferDetail
+from offers_app.search import search_backend, search_offers
+
+
+@override_settings(CACHES=NO_CACHE)
+class OfferListTests(TestCase):
+    """
+    Tests for GET /api/offers/.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(3):
+            _, client = create_user(f"business{i}", "business")
+            for j in range(3):
+                response = client.post(
+                    "/api/offers/", offer_payload(f"Offer {i}-{j}", 10 * (i + j) + 10),
+                    format="json")
+                self.assertEqual(response.status_code, 201)
+
+    def test_page_query_count_is_constant(self):
+        # COUNT, offers with their creator, prefetched details
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/offers/")
+        self.assertEqual(len(response.json()["results"]), 9)
+
+        _, client = create_user("business3", "business")
+        client.post("/api/offers/", offer_payload("Offer 3-0"), format="json")
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/offers/")
+        self.assertEqual(len(response.json()["results"]), 10)
+
+    def walk_cursor_pages(self, url):
+        """
+        Follows the next links from url and returns the ids of all pages.
+        """
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [offer["id"] for offer in response.json()["results"]]
+            url = response.json()["next"]
+        return ids
+
+    def test_cursor_pages_cover_every_offer_once_in_order(self):
+        for ordering, fields in OFFER_ORDERINGS.items():
+            with self.subTest(ordering=ordering):
+                ids = self.walk_cursor_pages(
+                    f"/api/offers/?pagination=cursor&page_size=2&ordering={ordering}")
+                expected = list(Offer.objects.order_by(*fields).values_list("id", flat=True))
+                self.assertEqual(ids, expected)
+
+    def test_cursor_pages_match_page_number_pages(self):
+        ids = self.walk_cursor_pages("/api/offers/?pagination=cursor&page_size=4")
+        page_ids = []
+        for page in (1, 2, 3):
+            response = self.client.get(f"/api/offers/?page_size=4&page={page}")
+            page_ids += [offer["id"] for offer in response.json()["results"]]
+        self.assertEqual(ids, page_ids)
+
+    def test_cursor_page_query_count_is_constant(self):
+        # Offers with their creator, prefetched details; no COUNT
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/offers/?pagination=cursor")
+        self.assertEqual(len(response.json()["results"]), 9)
+
+    def test_compiled_serializers_match_model_serializers(self):
+        Offer.objects.filter(id=Offer.objects.first().id).update(image="offer_images/logo.png")
+        urls = [
+            "/api/offers/",
+            "/api/offers/?search=Offer",
+            "/api/offers/?expand=business_stats",
+            "/api/offers/?ordering=min_price&page_size=4&page=2",
+            "/api/offers/?pagination=cursor&ordering=-min_delivery_time",
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                expected = self.client.get(url).json()
+                with override_settings(COMPILED_READ_SERIALIZERS=True):
+                    self.assertEqual(self.client.get(url).json(), expected)
+
+    def test_compiled_page_query_count_is_constant(self):
+        with override_settings(COMPILED_READ_SERIALIZERS=True):
+            with self.assertNumQueries(3):
+                self.client.get("/api/offers/")
+            with self.assertNumQueries(3):
+                self.client.get("/api/offers/?expand=business_stats")
+
+    def test_invalid_cursor_returns_404(self):
+        for cursor in ("not-base64!", encode_cursor(["abc", 1]),
+                       encode_cursor([None, 1]), encode_cursor({"a": 1})):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(f"/api/offers/?pagination=cursor&cursor={cursor}")
+                self.assertEqual(response.status_code, 404)
+
+    def test_relevance_ordering_is_rejected_with_cursor(self):
+        response = self.client.get("/api/offers/?pagination=cursor&search=Offer&ordering=relevance")
+        self.assertEqual(response.status_code, 400)
+
+
+class OfferQueryPlanTests(QueryPlanMixin, TestCase):
+    """
+    EXPLAIN-based tests that each whitelisted ordering and each list filter
+    of GET /api/offers/ is served by an index.
+    """
+    ordering_indexes = {
+        "updated_at": "offer_updated_id_idx",
+        "created_at": "offer_created_id_idx",
+        "min_price": "offer_min_price_id_idx",
+        "min_delivery_time": "offer_min_delivery_id_idx",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, _ = create_user("business", "business")
+
+    def test_every_ordering_has_an_index(self):
+        self.assertEqual(
+            {ordering.lstrip("-") for ordering in OFFER_ORDERINGS}, set(self.ordering_indexes))
+
+    def test_orderings_read_their_index_in_order(self):
+        for ordering, fields in OFFER_ORDERINGS.items():
+            with self.subTest(ordering=ordering):
+                self.assertUsesIndex(
+                    Offer.objects.order_by(*fields)[:11],
+                    self.ordering_indexes[ordering.lstrip("-")], ordered=True)
+
+    def test_creator_filter_uses_the_user_index(self):
+        for ordering, fields in OFFER_ORDERINGS.items():
+            with self.subTest(ordering=ordering):
+                self.assertUsesIndex(
+                    Offer.objects.filter(user_id=self.user.id).order_by(*fields)[:11],
+                    "offer_user_updated_idx", "offers_app_offer_user_id",
+                    ordered=ordering.lstrip("-") == "updated_at")
+
+    def test_price_and_delivery_filters_use_an_index(self):
+        # The COUNT of a filtered page
+        self.assertUsesIndex(
+            Offer.objects.filter(max_price__gte=100).values("id"), "offer_max_price_idx")
+        self.assertUsesIndex(
+            Offer.objects.filter(min_delivery_time__lte=3).values("id"),
+            "offer_min_delivery_id_idx")
+        # The page itself, in any whitelisted ordering
+        for ordering, fields in OFFER_ORDERINGS.items():
+            with self.subTest(ordering=ordering):
+                index = self.ordering_indexes[ordering.lstrip("-")]
+                self.assertUsesIndex(
+                    Offer.objects.filter(max_price__gte=100).order_by(*fields)[:11],
+                    index, "offer_max_price_idx")
+                self.assertUsesIndex(
+                    Offer.objects.filter(min_delivery_time__lte=3).order_by(*fields)[:11],
+                    index, "offer_min_delivery_id_idx")
+
+    def test_detail_lookups_use_the_detail_indexes(self):
+        self.assertUsesIndex(
+            OfferDetail.objects.filter(offer_id=1, offer_type="basic"),
+            "offerdetail_offer_type_idx")
+        self.assertUsesIndex(
+            OfferDetail.objects.filter(offer_id=1).order_by("price"),
+            "offerdetail_offer_price_idx", ordered=True)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class OfferListCacheTests(TransactionTestCase):
+    """
+    Tests for the versioned offer list cache. A TransactionTestCase, since
+    the offers version is only bumped once the writing transaction commits.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user, self.business_client = create_user("business", "business")
+        response = self.business_client.post("/api/offers/", offer_payload("Logo"), format="json")
+        self.offer_id = response.json()["id"]
+
+    def get_list(self):
+        response = self.client.get("/api/offers/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_miss_hit_and_miss_after_change(self):
+        self.assertEqual(get_cache_stats(), {"hits": 0, "misses": 0})
+        self.get_list()
+        self.assertEqual(get_cache_stats(), {"hits": 0, "misses": 1})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_list()["results"][0]["title"], "Logo")
+        self.assertEqual(get_cache_stats(), {"hits": 1, "misses": 1})
+
+        self.business_client.patch(
+            f"/api/offers/{self.offer_id}/", {"title": "Logo Pro"}, format="json")
+        self.assertEqual(self.get_list()["results"][0]["title"], "Logo Pro")
+        self.assertEqual(get_cache_stats(), {"hits": 1, "misses": 2})
+
+    def test_profile_change_invalidates_the_list(self):
+        self.get_list()
+        UserProfile.objects.filter(user=self.user).get().save()
+        self.get_list()
+        self.assertEqual(get_cache_stats(), {"hits": 0, "misses": 2})
+
+    def test_query_params_are_cached_separately(self):
+        self.get_list()
+        self.client.get("/api/offers/", {"ordering": "min_price"})
+        self.client.get("/api/offers/", {"ordering": "min_price", "utm_source": "x"})
+        self.assertEqual(get_cache_stats(), {"hits": 1, "misses": 2})
+
+
+@override_settings(CACHES=NO_CACHE)
+class OfferConditionalGetTests(TestCase):
+    """
+    Tests for ETag and Last-Modified on the offer and offer detail endpoints.
+    """
+
+    def setUp(self):
+        self.user, self.client = create_user("business", "business")
+        response = self.client.post("/api/offers/", offer_payload("Logo"), format="json")
+        self.offer_id = response.json()["id"]
+        self.detail_id = response.json()["details"][0]["id"]
+
+    def test_matching_etag_returns_304(self):
+        for url in (f"/api/offers/{self.offer_id}/", f"/api/offerdetails/{self.detail_id}/"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response.headers["ETag"]
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers["ETag"], etag)
+                self.assertEqual(response.content, b"")
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+                self.assertEqual(response.status_code, 200)
+
+    def test_change_invalidates_etag_and_last_modified(self):
+        url = f"/api/offers/{self.offer_id}/"
+        response = self.client.get(url)
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        Offer.objects.filter(id=self.offer_id).update(
+            updated_at=timezone.now() + timedelta(seconds=5))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+    def test_missing_offer_returns_404(self):
+        response = self.client.get("/api/offers/999/", HTTP_IF_NONE_MATCH='"999-1"')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=NO_CACHE)
+class OfferSearchTests(TestCase):
+    """
+    Tests for ?search= on GET /api/offers/ and the full-text search index.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user, self.business_client = create_user("business", "business")
+
+    def create_offer(self, title, description):
+        payload = offer_payload(title)
+        payload["description"] = description
+        response = self.business_client.post("/api/offers/", payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        return response.json()["id"]
+
+    def search(self, term):
+        response = self.client.get("/api/offers/", {"search": term})
+        self.assertEqual(response.status_code, 200)
+        return [offer["id"] for offer in response.json()["results"]]
+
+    def test_matches_word_prefixes_in_title_and_description(self):
+        logo = self.create_offer("Logo design", "Vector artwork")
+        website = self.create_offer("Website", "Landing page with a logo")
+        self.create_offer("Copywriting", "Texts for your shop")
+        self.assertCountEqual(self.search("log"), [logo, website])
+        self.assertEqual(self.search("vector art"), [logo])
+        self.assertEqual(self.search("logo (shop"), [])
+
+    def test_does_not_match_inside_words(self):
+        self.create_offer("Logo design", "Vector artwork")
+        if search_backend() is not None:
+            self.assertEqual(self.search("ogo"), [])
+
+    def test_orders_by_relevance(self):
+        once = self.create_offer("Website", "A logo in the footer of a long page text")
+        often = self.create_offer("Logo", "Logo redesign for your logo")
+        self.assertEqual(self.search("logo"), [often, once])
+
+    def test_index_follows_updates_and_deletes(self):
+        offer_id = self.create_offer("Logo design", "Vector artwork")
+        response = self.business_client.patch(
+            f"/api/offers/{offer_id}/", {"title": "Illustration"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.search("logo"), [])
+        self.assertEqual(self.search("illustration"), [offer_id])
+
+        self.business_client.delete(f"/api/offers/{offer_id}/")
+        self.assertEqual(self.search("illustration"), [])
+
+    def test_rebuild_command_restores_the_index(self):
+        offer_id = self.create_offer("Logo design", "Vector artwork")
+        if search_backend() == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM offers_app_offer_fts")
+            self.assertEqual(self.search("logo"), [])
+        call_command("rebuild_offer_search_index", stdout=StringIO())
+        self.assertEqual(self.search("logo"), [offer_id])
+
+
+@override_settings(CACHES=NO_CACHE)
+class OfferBulkTests(TestCase):
+    """
+    Tests for POST /api/offers/bulk/.
+    """
+
+    def setUp(self):
+        self.user, self.client = create_user("business", "business")
+
+    def test_creates_offers_with_details(self):
+        payload = [offer_payload(f"Bulk {i}") for i in range(3)]
+        with self.assertNumQueries(8):
+            response = self.client.post("/api/offers/bulk/", payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        offers = Offer.objects.filter(user=self.user)
+        self.assertEqual(offers.count(), 3)
+        self.assertEqual(sorted(offer.details.count() for offer in offers), [3, 3, 3])
+        self.assertEqual(
+            self.client.get("/api/offers/", {"search": "Bulk"}).json()["count"], 3)
+
+    def test_reports_invalid_items_by_index(self):
+        payload = [offer_payload("Bulk 0"), {"title": "Broken"}, offer_payload("Bulk 2")]
+        response = self.client.post("/api/offers/bulk/", payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()["created"], response.json()["failed"]), (2, 1))
+        self.assertEqual([error["index"] for error in response.json()["errors"]], [1])
+        self.assertEqual(Offer.objects.count(), 2)
+
+        response = self.client.post("/api/offers/bulk/", [{"title": "Broken"}], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Offer.objects.count(), 2)
+
+    @override_settings(OFFERS_BULK_MAX_ITEMS=2)
+    def test_rejects_more_than_max_items(self):
+        payload = [offer_payload(f"Bulk {i}") for i in range(3)]
+        response = self.client.post("/api/offers/bulk/", payload, format="json")
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Offer.objects.exists())
+
+    def test_requires_business_token(self):
+        _, client = create_user("customer", "customer")
+        response = client.post("/api/offers/bulk/", [offer_payload("Bulk")], format="json")
+        self.assertEqual(response.status_code, 403)
+        response = APIClient().post("/api/offers/bulk/", [offer_payload("Bulk")], format="json")
+        self.assertEqual(response.status_code, 401)
+
+
+@benchmark
+class OfferSearchBenchmark(TestCase):
+    """
+    Compares the full-text search with the previous icontains scan.
+    """
+    words = ["logo", "design", "website", "branding", "video", "editing", "copy",
+             "writing", "shop", "landing", "page", "social", "media", "vector", "print"]
+
+    @classmethod
+    def setUpTestData(cls):
+        user, _ = create_user("business", "business")
+        rng = random.Random(1)
+        cls.offer_count = benchmark_size(100_000)
+        Offer.objects.bulk_create(
+            [Offer(user=user,
+                   title=" ".join(rng.choices(cls.words, k=3)),
+                   description=" ".join(rng.choices(cls.words, k=40)) + f" item{i}")
+             for i in range(cls.offer_count)],
+            batch_size=5000,
+        )
+        call_command("rebuild_offer_search_index", stdout=StringIO())
+
+    def test_search_beats_icontains(self):
+        term = f"item{self.offer_count // 2}"
+
+        def full_text():
+            queryset = search_offers(Offer.objects.all(), term)
+            queryset.count()
+            list(queryset.order_by("-search_rank", "-updated_at", "-id")[:10])
+
+        def icontains():
+            queryset = Offer.objects.filter(
+                Q(title__icontains=term) | Q(description__icontains=term))
+            queryset.count()
+            list(queryset.order_by("-updated_at", "-id")[:10])
+
+        full_text_time = measure(full_text)
+        icontains_time = measure(icontains)
+        print(f"\nSearch over {self.offer_count} offers: "
+              f"full-text {full_text_time * 1000:.1f} ms, "
+              f"icontains {icontains_time * 1000:.1f} ms")
+        self.assertLess(full_text_time, icontains_time)
+
+
+@benchmark
+class OfferSerializerBenchmark(TestCase):
+    """
+    Rows per second of the offer list serializers, ModelSerializer vs compiled.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        user, _ = create_user("business", "business")
+        cls.offer_count = benchmark_size(5000)
+        offers = Offer.objects.bulk_create(
+            [Offer(user=user, title=f"Offer {i}", description="Logo design")
+             for i in range(cls.offer_count)],
+            batch_size=1000,
+        )
+        OfferDetail.objects.bulk_create(
+            [OfferDetail(offer=offer, title=offer_type, revisions=1, delivery_time_in_days=3,
+                         price=100, features=["Logo"], offer_type=offer_type)
+             for offer in offers for offer_type in ("basic", "standard", "premium")],
+            batch_size=1000,
+        )
+
+    def test_offer_list_rows_per_second(self):
+        context = {"request": Request(APIRequestFactory().get("/api/offers/"))}
+        ordering = ("-updated_at", "-id")
+
+        def model_serializer():
+            offers = Offer.objects.for_list().order_by(*ordering)
+            return OfferGetSerializer(offers, many=True, context=context).data
+
+        def compiled():
+            offers = Offer.objects.order_by(*ordering).values(
+                *OfferGetCompiledSerializer.value_lookups())
+            return OfferGetCompiledSerializer(offers, context=context).data
+
+        rates = report_rows_per_second("GET /api/offers/", self.offer_count, {
+            "ModelSerializer": model_serializer, "compiled": compiled})
+        self.assertGreater(rates["compiled"], rates["ModelSerializer"])
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from orders_app.models import OrderMainModel
+from django.db import transaction
+from orders_app.models import BusinessOrderCounter, OrderMainModel
 
 
 @admin.register(OrderMainModel)
@@ -8,3 +9,23 @@ class OrderAdmin(admin.ModelAdmin):
                     "status", "created_at")
     list_filter = ("status", "created_at")
     search_fields = ("customer_user__username", "business_user__username")
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            previous = None
+            if change:
+                previous = OrderMainModel.objects.select_for_update().only(
+                    "status", "business_user_id").get(pk=obj.pk)
+            super().save_model(request, obj, form, change)
+
+            if previous is None:
+                BusinessOrderCounter.apply(obj.business_user_id, {obj.status: 1})
+            elif (previous.business_user_id, previous.status) != (obj.business_user_id, obj.status):
+                BusinessOrderCounter.apply(previous.business_user_id, {previous.status: -1})
+                BusinessOrderCounter.apply(obj.business_user_id, {obj.status: 1})
+
+    def delete_model(self, request, obj):
+        OrderMainModel.delete_orders([obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        OrderMainModel.delete_orders(list(queryset.values_list("id", flat=True)))
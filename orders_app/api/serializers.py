@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
-from orders_app.models import OrderMainModel, OfferDetail
+from django.db import transaction
+from django.conf import settings
+from orders_app.models import OrderMainModel, OfferDetail, BusinessOrderCounter, ORDER_STATUSES
+from core.serializers import CompiledReadSerializer, DATETIME, PRICE_2_PLACES
+from notifications_app.outbox import publish
 
 
 class OrderPostSerializer(serializers.Serializer):
@@ -32,30 +36,27 @@ class OrderPostSerializer(serializers.Serializer):
         if request.user.profile.type != "customer":
             raise PermissionDenied("Only customers can place orders.")
 
-        return OrderMainModel.objects.create(
-            customer_user=request.user,
-            business_user=offer.user,
-            offer_detail=offer_detail,
-            status="in_progress"
-        )
+        with transaction.atomic():
+            order = OrderMainModel.objects.create(
+                customer_user=request.user,
+                business_user=offer.user,
+                offer_detail=offer_detail,
+                status="in_progress",
+                **OrderMainModel.snapshot(offer_detail)
+            )
+            BusinessOrderCounter.apply(order.business_user_id, {order.status: 1})
+            publish("order.created", order.event_payload(order.business_user_id))
+        return order
 
 
 class OrderGetResponseSerializer(serializers.ModelSerializer):
     """
-    Serializer for returning order information enriched with data from the related OfferDetail.
-    Used for GET responses.
+    Serializer for returning order information including the offer detail
+    snapshot stored on the order. Used for GET responses.
     """
-    title = serializers.CharField(source="offer_detail.title", read_only=True)
-    revisions = serializers.IntegerField(
-        source="offer_detail.revisions", read_only=True)
-    delivery_time_in_days = serializers.IntegerField(
-        source="offer_detail.delivery_time_in_days", read_only=True)
     price = serializers.DecimalField(
-        source="offer_detail.price", max_digits=10, decimal_places=2, read_only=True)
-    features = serializers.ListField(
-        source="offer_detail.features", read_only=True)
-    offer_type = serializers.CharField(
-        source="offer_detail.offer_type", read_only=True)
+        max_digits=10, decimal_places=2, read_only=True)
+    features = serializers.ListField(read_only=True)
 
     class Meta:
         model = OrderMainModel
@@ -78,19 +79,11 @@ class OrderGetResponseSerializer(serializers.ModelSerializer):
 class OrderPostResponseSerializer(serializers.ModelSerializer):
     """
     Serializer for returning order data after a successful creation.
-    Includes related OfferDetail data for client display.
+    Includes the offer detail snapshot stored on the order for client display.
     """
-    title = serializers.CharField(source="offer_detail.title", read_only=True)
-    revisions = serializers.IntegerField(
-        source="offer_detail.revisions", read_only=True)
-    delivery_time_in_days = serializers.IntegerField(
-        source="offer_detail.delivery_time_in_days", read_only=True)
     price = serializers.DecimalField(
-        source="offer_detail.price", read_only=True, max_digits=10, decimal_places=2)
-    features = serializers.ListField(
-        source="offer_detail.features", read_only=True)
-    offer_type = serializers.CharField(
-        source="offer_detail.offer_type", read_only=True)
+        read_only=True, max_digits=10, decimal_places=2)
+    features = serializers.ListField(read_only=True)
 
     class Meta:
         model = OrderMainModel
@@ -108,3 +101,40 @@ class OrderPostResponseSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at"
         ]
+
+
+class OrderBulkStatusSerializer(serializers.Serializer):
+    """
+    Serializer validating a bulk status change of many orders.
+    """
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=getattr(settings, "ORDER_BULK_STATUS_MAX_IDS", 500),
+    )
+    status = serializers.ChoiceField(choices=ORDER_STATUSES)
+
+
+class OrderGetCompiledSerializer(CompiledReadSerializer):
+    """
+    Compiled read serializer producing the same output as OrderGetResponseSerializer
+    from `.values()` rows.
+    """
+    fields = (
+        ("id", "id", None),
+        ("customer_user", "customer_user_id", None),
+        ("business_user", "business_user_id", None),
+        ("title", "title", None),
+        ("revisions", "revisions", None),
+        ("delivery_time_in_days", "delivery_time_in_days", None),
+        ("price", "price", PRICE_2_PLACES),
+        ("features", "features", "get_features"),
+        ("offer_type", "offer_type", None),
+        ("status", "status", None),
+        ("created_at", "created_at", DATETIME),
+        ("updated_at", "updated_at", DATETIME),
+    )
+
+    def get_features(self, row):
+        features = row["features"]
+        return None if features is None else list(features)
@@ -1,11 +1,17 @@
 from django.urls import path
-from .views import OrderCombinedView, OrderPatchDeleteView, OrderCountView, OrderCompletedCountView
+from .views import OrderCombinedView, OrderPatchDeleteView, OrderCountView, OrderCompletedCountView, OrderStatsView, OrderBulkStatusView, OrderExportView
 
 # URL patterns for managing and analyzing orders
 urlpatterns = [
     # Endpoint to list all orders for the user or to create a new order
     path("orders/", OrderCombinedView.as_view(), name="orders"),
 
+    # Endpoint to move many orders of a business user to a new status at once
+    path("orders/bulk-status/", OrderBulkStatusView.as_view(), name="orders-bulk-status"),
+
+    # Endpoint to stream the order history of a business user as CSV or NDJSON
+    path("orders/export/", OrderExportView.as_view(), name="orders-export"),
+
     # Endpoint to update the status of an order or delete it (admin only for DELETE)
     path("orders/<int:pk>/", OrderPatchDeleteView.as_view(), name="order-detail"),
 
@@ -15,4 +21,7 @@ urlpatterns = [
     # Endpoint to get the count of all completed orders for the current user
     path("completed-order-count/<int:pk>/",
          OrderCompletedCountView.as_view(), name="order-count-all"),
+
+    # Endpoint to get the order counts per status for many business users at once
+    path("order-stats/", OrderStatsView.as_view(), name="order-stats"),
 ]
@@ -1,20 +1,97 @@
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.authentication import TokenAuthentication
-from django.db.models import Q
+import csv
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.db import IntegrityError, connection, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import ParseError, PermissionDenied
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from rest_framework.response import Response
 from rest_framework.status import HTTP_204_NO_CONTENT
-from orders_app.models import OrderMainModel
-from .serializers import OrderGetResponseSerializer, OrderPostSerializer, OrderPostResponseSerializer
-from django.contrib.auth.models import User
+from rest_framework.views import APIView
+
+from core.pagination import KeysetPagination, get_pagination_mode
+from core.serializers import use_compiled_serializers
+from orders_app.models import (
+    ORDER_STATUSES,
+    ArchivedOrder,
+    BusinessOrderCounter,
+    DeletedOrder,
+    OrderIdempotencyKey,
+    OrderMainModel,
+)
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import (
+    OrderBulkStatusSerializer,
+    OrderGetCompiledSerializer,
+    OrderGetResponseSerializer,
+    OrderPostResponseSerializer,
+    OrderPostSerializer,
+)
+
+
+# Ordering of the order list, newest first with the id as tiebreaker
+ORDER_LIST_ORDERING = ("-created_at", "-id")
+
+# Salt of the signed sync tokens issued by the order list
+ORDER_SYNC_SALT = "orders_app.sync"
+
+
+class OrderCursorPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+
+
+def make_sync_token(user, synced_at):
+    """
+    Returns a signed token recording up to when the user's orders were synced.
+    """
+    return signing.dumps(
+        {"user": user.id, "since": synced_at.isoformat()}, salt=ORDER_SYNC_SALT)
+
+
+def get_sync_since(request):
+    """
+    Returns the point in time to sync from, taken from ?sync_token= or
+    ?updated_since=, or None for a regular (full) order list.
+    """
+    token = request.query_params.get("sync_token")
+    if token:
+        try:
+            data = signing.loads(token, salt=ORDER_SYNC_SALT)
+        except signing.BadSignature:
+            raise ParseError("Invalid sync_token.")
+        if data.get("user") != request.user.id:
+            raise ParseError("Invalid sync_token.")
+        return parse_datetime(data["since"])
+
+    updated_since = request.query_params.get("updated_since")
+    if not updated_since:
+        return None
+    try:
+        since = parse_datetime(updated_since)
+    except ValueError:
+        # Well-formed but invalid values, e.g. month 13
+        since = None
+    if since is None:
+        raise ParseError("updated_since must be an ISO 8601 timestamp.")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
 
 
 class OrderCombinedView(APIView):
     """
     Handles order listing and creation.
-    - GET: Returns all orders where the user is either the customer or the business.
+    - GET: Returns the orders where the user is either the customer or the business.
     - POST: Allows a customer to create a new order.
     """
     authentication_classes = [TokenAuthentication]
@@ -22,19 +99,133 @@ class OrderCombinedView(APIView):
 
     def get(self, request):
         """
-        Returns all orders for the current user (as customer or business).
+        Returns the orders of the current user (as customer or business).
+        Supports:
+        - status: Only orders with this status
+        - role: 'customer' or 'business' to list only one side
+        - pagination: 'list' (default, full list) or 'cursor'
+          for keyset pagination on created_at descending
+        - updated_since / sync_token: Only orders changed since then plus the
+          ids of deleted orders, and a new sync_token for the next call
+        - include_archived=1: Also read closed orders moved to the archive
+        """
+        user = request.user
+
+        status_filter = request.query_params.get("status")
+        if status_filter and status_filter not in ORDER_STATUSES:
+            return Response({"detail": "Invalid status value."}, status=400)
+
+        role = request.query_params.get("role")
+        if role and role not in ("customer", "business"):
+            return Response({"detail": "role must be 'customer' or 'business'."}, status=400)
+
+        # One branch per role (and table), combined with UNION instead of
+        # OR + DISTINCT, so each branch can use its own (user, created_at) index
+        include_archived = request.query_params.get("include_archived") in ("1", "true")
+        models = (OrderMainModel, ArchivedOrder) if include_archived else (OrderMainModel,)
+        branches = []
+        for model in models:
+            if role in (None, "customer"):
+                branches.append(model.objects.filter(customer_user=user))
+            if role in (None, "business"):
+                branches.append(model.objects.filter(business_user=user))
+        if status_filter:
+            branches = [branch.filter(status=status_filter) for branch in branches]
+
+        since = get_sync_since(request)
+        if since is not None:
+            return self.sync_orders(request, branches, since)
+
+        if get_pagination_mode(request, "ORDERS_PAGINATION", "list") == "cursor":
+            paginator = OrderCursorPagination(
+                ordering=ORDER_LIST_ORDERING, model=OrderMainModel)
+            paginator.prepare(request)
+            keyset_q = paginator.get_keyset_q()
+            limit = paginator.page_size + 1
+            branches = [branch.filter(keyset_q) for branch in branches]
+            rows = paginator.finalize(self.union_orders(branches, limit=limit))
+            return paginator.get_paginated_response(self.serialize_orders(rows))
+
+        return Response(self.serialize_orders(self.union_orders(branches)), status=200)
+
+    def sync_orders(self, request, branches, since):
+        """
+        Returns the orders changed since the given time, tombstones of
+        orders deleted since then, and a sync token for the next call.
         """
         user = request.user
-        queryset = OrderMainModel.objects.filter(
-            Q(customer_user=user) | Q(business_user=user)
-        ).distinct()
-        serializer = OrderGetResponseSerializer(queryset, many=True)
-        return Response(serializer.data, status=200)
+        synced_at = timezone.now()
+
+        changed = [branch.filter(updated_at__gte=since) for branch in branches]
+        rows = self.union_orders(changed)
+
+        role = request.query_params.get("role")
+        tombstones = DeletedOrder.objects.none()
+        if role in (None, "customer"):
+            tombstones = tombstones.union(DeletedOrder.objects.filter(
+                customer_user=user, deleted_at__gte=since).values("order_id"))
+        if role in (None, "business"):
+            tombstones = tombstones.union(DeletedOrder.objects.filter(
+                business_user=user, deleted_at__gte=since).values("order_id"))
+
+        return Response({
+            "orders": self.serialize_orders(rows),
+            "deleted": sorted(row["order_id"] for row in tombstones),
+            "sync_token": make_sync_token(user, synced_at),
+        }, status=200)
+
+    @staticmethod
+    def union_orders(branches, limit=None):
+        """
+        Returns the rows of the orders in all branches, newest first, read
+        with a single UNION statement. Where the database allows it, each
+        branch is ordered and limited on its own before the UNION.
+        """
+        push_down = (
+            limit is not None
+            and len(branches) > 1
+            and connection.features.supports_slicing_ordering_in_compound
+        )
+        rows = []
+        for branch in branches:
+            branch = branch.values(*OrderGetCompiledSerializer.value_lookups())
+            if push_down:
+                branch = branch.order_by(*ORDER_LIST_ORDERING)[:limit]
+            rows.append(branch)
+
+        combined = rows[0].union(*rows[1:]) if len(rows) > 1 else rows[0]
+        combined = combined.order_by(*ORDER_LIST_ORDERING)
+        if limit is not None:
+            combined = combined[:limit]
+        return list(combined)
+
+    @staticmethod
+    def serialize_orders(rows):
+        """
+        Renders order rows, which come from the orders table or the archive.
+        """
+        if use_compiled_serializers():
+            return OrderGetCompiledSerializer(rows).data
+        orders = [OrderMainModel(**row) for row in rows]
+        return OrderGetResponseSerializer(orders, many=True).data
 
     def post(self, request):
         """
         Creates a new order. Only users with type 'customer' are allowed to post.
+        With an Idempotency-Key header, a retried request returns the original
+        response without validating or inserting again.
         """
+        key = request.headers.get("Idempotency-Key")
+        if key is not None:
+            if not key or len(key) > 255:
+                return Response({"detail": "Invalid Idempotency-Key."}, status=400)
+            request_hash = hashlib.sha256(
+                json.dumps(request.data, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            replay = self.replay_idempotent(request, key, request_hash)
+            if replay is not None:
+                return replay
+
         serializer = OrderPostSerializer(
             data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
@@ -42,9 +233,56 @@ class OrderCombinedView(APIView):
         if request.user.profile.type != "customer":
             raise PermissionDenied("Nur Kunden dürfen Bestellungen aufgeben.")
 
-        order = serializer.save()
-        response_serializer = OrderPostResponseSerializer(order)
-        return Response(response_serializer.data, status=201)
+        if key is None:
+            order = serializer.save()
+            response_serializer = OrderPostResponseSerializer(order)
+            return Response(response_serializer.data, status=201)
+
+        try:
+            with transaction.atomic():
+                order = serializer.save()
+                data = OrderPostResponseSerializer(order).data
+                ttl = getattr(settings, "ORDER_IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+                OrderIdempotencyKey.objects.create(
+                    user=request.user,
+                    key=key,
+                    request_hash=request_hash,
+                    order=order,
+                    response_status=201,
+                    response_body=data,
+                    expires_at=timezone.now() + timedelta(seconds=ttl),
+                )
+        except IntegrityError:
+            # A concurrent request with the same key committed first
+            replay = self.replay_idempotent(request, key, request_hash)
+            if replay is None:
+                raise
+            return replay
+        return Response(data, status=201)
+
+    @staticmethod
+    def replay_idempotent(request, key, request_hash):
+        """
+        Returns the stored response for an Idempotency-Key of the user,
+        or None if the key is unknown or expired.
+        """
+        stored = OrderIdempotencyKey.objects.filter(
+            user=request.user, key=key).first()
+        if stored is None:
+            return None
+        if stored.expires_at <= timezone.now():
+            stored.delete()
+            return None
+        if stored.request_hash != request_hash:
+            return Response(
+                {"detail": "Idempotency-Key was already used for a different request."},
+                status=422
+            )
+        return Response(
+            stored.response_body,
+            status=stored.response_status,
+            headers={"Idempotent-Replayed": "true"},
+        )
 
 
 class OrderPatchDeleteView(APIView):
@@ -66,15 +304,15 @@ class OrderPatchDeleteView(APIView):
     def patch(self, request, pk):
         """
         Updates the 'status' of an order (only allowed by the assigned business user).
-        Allowed status values: in_progress, completed, cancelled.
+        Allowed transitions: in_progress -> completed, in_progress -> cancelled.
+        The change locks the order and only applies if its current status allows it.
         """
         try:
-            order = OrderMainModel.objects.select_related(
-                "offer_detail__offer").get(pk=pk)
+            order = OrderMainModel.objects.get(pk=pk)
         except OrderMainModel.DoesNotExist:
             return Response({"detail": "Order not found."}, status=404)
 
-        if request.user.id != order.business_user.id:
+        if request.user.id != order.business_user_id:
             return Response({"detail": "You are not authorized to update this order."}, status=401)
 
         allowed_fields = ["status"]
@@ -82,11 +320,19 @@ class OrderPatchDeleteView(APIView):
             return Response({"detail": "Only 'status' field can be updated."}, status=400)
 
         new_status = request.data.get("status")
-        if new_status not in ["in_progress", "completed", "cancelled"]:
+        if new_status not in ORDER_STATUSES:
             return Response({"detail": "Invalid status value."}, status=400)
 
-        order.status = new_status
-        order.save()
+        changed_ids = OrderMainModel.change_status(
+            request.user.id, [pk], new_status)
+        order.refresh_from_db()
+
+        if not changed_ids and order.status != new_status:
+            return Response(
+                {"detail": f"Cannot change status from '{order.status}' to '{new_status}'."},
+                status=400
+            )
+
         response_serializer = OrderPostResponseSerializer(order)
         return Response(response_serializer.data, status=200)
 
@@ -94,11 +340,148 @@ class OrderPatchDeleteView(APIView):
         """
         Deletes an order. Only allowed for admin users.
         """
-        order = get_object_or_404(OrderMainModel, id=pk)
-        order.delete()
+        if not OrderMainModel.delete_orders([pk]):
+            raise Http404
         return Response(status=HTTP_204_NO_CONTENT)
 
 
+def get_business_order_count(pk, status):
+    """
+    Returns the maintained order count of a business user for one status
+    from a single primary key lookup, or None if no counter row exists.
+    """
+    return BusinessOrderCounter.objects.filter(business_user_id=pk).values_list(
+        BusinessOrderCounter.count_field(status), flat=True).first()
+
+
+class OrderBulkStatusView(APIView):
+    """
+    Lets a business user move many of their orders to a new status at once.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        Expects {"order_ids": [...], "status": "..."} and returns the ids of the
+        orders that changed. Orders of other users or in a status that does not
+        allow the transition are left untouched.
+        """
+        user = request.user
+        if not hasattr(user, "profile") or user.profile.type != "business":
+            return Response({"detail": "Only business users can update orders."}, status=403)
+
+        serializer = OrderBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        updated_ids = OrderMainModel.change_status(
+            user.id,
+            serializer.validated_data["order_ids"],
+            serializer.validated_data["status"],
+        )
+        return Response({"updated_ids": sorted(updated_ids)}, status=200)
+
+
+def get_export_bound(request, name):
+    """
+    Reads an optional ISO 8601 date or timestamp query parameter
+    as an aware datetime (dates mean midnight).
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        bound = parse_datetime(value)
+        day = parse_date(value) if bound is None else None
+    except ValueError:
+        # Well-formed but invalid values, e.g. month 13
+        bound = day = None
+    if bound is None:
+        if day is None:
+            raise ParseError(f"{name} must be an ISO 8601 date or timestamp.")
+        bound = datetime.combine(day, time.min)
+    if timezone.is_naive(bound):
+        bound = timezone.make_aware(bound)
+    return bound
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer
+    produces lines for a streaming response instead of filling a buffer.
+    """
+
+    def write(self, value):
+        return value
+
+
+class OrderExportView(APIView):
+    """
+    Streams the complete order history of a business user as CSV or NDJSON.
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+
+    def get(self, request):
+        """
+        Query params:
+        - format: 'csv' (default) or 'ndjson'
+        - created_after / created_before: optional date range on created_at
+        Archived orders come first, then the active ones, each by created_at.
+        Rows are fetched in chunks, so memory stays constant for any number of orders.
+        """
+        user = request.user
+        if not hasattr(user, "profile") or user.profile.type != "business":
+            return Response({"detail": "Only business users can export orders."}, status=403)
+
+        created_after = get_export_bound(request, "created_after")
+        created_before = get_export_bound(request, "created_before")
+
+        querysets = []
+        for model in (ArchivedOrder, OrderMainModel):
+            queryset = model.objects.filter(business_user=user)
+            if created_after is not None:
+                queryset = queryset.filter(created_at__gte=created_after)
+            if created_before is not None:
+                queryset = queryset.filter(created_at__lt=created_before)
+            querysets.append(queryset.order_by("created_at", "id").values(
+                *OrderGetCompiledSerializer.value_lookups()))
+
+        export_format = request.accepted_renderer.format
+        if export_format == "ndjson":
+            lines = self.ndjson_lines(querysets)
+        else:
+            lines = self.csv_lines(querysets)
+
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f"; charset={renderer.charset}"
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="orders.{export_format}"'
+        return response
+
+    @staticmethod
+    def iter_orders(querysets):
+        chunk_size = getattr(settings, "ORDER_EXPORT_CHUNK_SIZE", 2000)
+        serializer = OrderGetCompiledSerializer(())
+        for queryset in querysets:
+            for row in queryset.iterator(chunk_size=chunk_size):
+                yield serializer.to_representation(row)
+
+    def csv_lines(self, querysets):
+        writer = csv.writer(Echo())
+        columns = [name for name, _, _ in OrderGetCompiledSerializer.fields]
+        yield writer.writerow(columns)
+        for order in self.iter_orders(querysets):
+            order["features"] = json.dumps(order["features"])
+            yield writer.writerow([order[column] for column in columns])
+
+    def ndjson_lines(self, querysets):
+        for order in self.iter_orders(querysets):
+            yield json.dumps(order) + "\n"
+
+
 class OrderCountView(APIView):
     """
     Returns the count of 'in_progress' orders for a given business user.
@@ -106,6 +489,11 @@ class OrderCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
+        count = get_business_order_count(pk, "in_progress")
+        if count is not None:
+            return Response({"order_count": count}, status=200)
+
+        # No counter yet: validate the user, a business without orders has 0
         try:
             user = User.objects.get(pk=pk)
         except User.DoesNotExist:
@@ -114,12 +502,7 @@ class OrderCountView(APIView):
         if not hasattr(user, 'profile') or user.profile.type != "business":
             return Response({"detail": "User exists but is not a business profile."}, status=400)
 
-        count = OrderMainModel.objects.filter(
-            business_user=user,
-            status="in_progress"
-        ).count()
-
-        return Response({"order_count": count}, status=200)
+        return Response({"order_count": 0}, status=200)
 
 
 class OrderCompletedCountView(APIView):
@@ -129,6 +512,11 @@ class OrderCompletedCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
+        count = get_business_order_count(pk, "completed")
+        if count is not None:
+            return Response({"completed_order_count": count}, status=200)
+
+        # No counter yet: validate the user, a business without orders has 0
         try:
             user = User.objects.get(pk=pk)
         except User.DoesNotExist:
@@ -137,9 +525,41 @@ class OrderCompletedCountView(APIView):
         if not hasattr(user, 'profile') or user.profile.type != "business":
             return Response({"detail": "User is not a business profile."}, status=400)
 
-        count = OrderMainModel.objects.filter(
-            business_user=user,
-            status="completed"
-        ).count()
+        return Response({"completed_order_count": 0}, status=200)
+
+
+class OrderStatsView(APIView):
+    """
+    Returns the order counts per status for many business users at once.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Expects ?business_ids=1,2,3. Reads all counters in one indexed query;
+        users without orders (or without a business profile) get zero counts.
+        """
+        raw_ids = request.query_params.get("business_ids", "")
+        try:
+            business_ids = list(dict.fromkeys(
+                int(value) for value in raw_ids.split(",") if value.strip()))
+        except ValueError:
+            return Response({"detail": "business_ids must be a comma-separated list of integers."}, status=400)
+
+        if not business_ids:
+            return Response({"detail": "business_ids is required."}, status=400)
+
+        max_ids = getattr(settings, "ORDER_STATS_MAX_IDS", 100)
+        if len(business_ids) > max_ids:
+            return Response({"detail": f"At most {max_ids} business_ids are allowed."}, status=400)
 
-        return Response({"completed_order_count": count}, status=200)
+        counters = BusinessOrderCounter.objects.in_bulk(business_ids)
+        results = []
+        for business_id in business_ids:
+            counter = counters.get(business_id) or BusinessOrderCounter()
+            results.append({
+                "business_user": business_id,
+                **{status: getattr(counter, BusinessOrderCounter.count_field(status))
+                   for status in ORDER_STATUSES},
+            })
+        return Response(results, status=200)
@@ -0,0 +1,57 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from orders_app.models import OrderMainModel, ArchivedOrder
+
+
+# Statuses an order can no longer leave, so it may be archived
+CLOSED_ORDER_STATUSES = ("completed", "cancelled")
+
+
+class Command(BaseCommand):
+    """
+    Moves closed orders older than a given age from the orders table
+    into the archive table, one batch per transaction.
+    """
+    help = "Moves closed orders older than a given age into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days", type=int,
+            default=getattr(settings, "ORDER_ARCHIVE_AFTER_DAYS", 365),
+            help="Archive closed orders not updated for this many days.")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of orders moved per transaction.")
+        parser.add_argument(
+            "--interval", type=float, default=None,
+            help="Keep running and archive again every this many seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            total = self.archive(options["older_than_days"], options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Archived {total} orders."))
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
+
+    def archive(self, older_than_days, batch_size):
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+        total = 0
+        while True:
+            with transaction.atomic():
+                orders = list(OrderMainModel.objects.select_for_update().filter(
+                    status__in=CLOSED_ORDER_STATUSES,
+                    updated_at__lt=cutoff,
+                ).order_by("id")[:batch_size])
+                if not orders:
+                    return total
+                ArchivedOrder.objects.bulk_create(
+                    [ArchivedOrder.from_order(order) for order in orders])
+                OrderMainModel.objects.filter(
+                    id__in=[order.id for order in orders]).delete()
+            total += len(orders)
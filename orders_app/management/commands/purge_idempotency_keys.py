@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from orders_app.models import OrderIdempotencyKey
+
+
+class Command(BaseCommand):
+    """
+    Deletes expired order idempotency keys in batches.
+    """
+    help = "Deletes expired order idempotency keys in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of keys deleted per statement.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        total = 0
+        while True:
+            ids = list(OrderIdempotencyKey.objects.filter(
+                expires_at__lte=now).values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            OrderIdempotencyKey.objects.filter(id__in=ids).delete()
+            total += len(ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {total} expired idempotency keys."))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from orders_app.models import OrderMainModel, ArchivedOrder, BusinessOrderCounter
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds all per-business order counters from the orders and archive tables.
+    """
+    help = "Rebuilds all per-business order counters from the orders and archive tables."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counters = {}
+            for model in (OrderMainModel, ArchivedOrder):
+                rows = model.objects.values(
+                    "business_user", "status").annotate(count=Count("id")).order_by()
+                for row in rows:
+                    counter = counters.setdefault(
+                        row["business_user"],
+                        BusinessOrderCounter(business_user_id=row["business_user"]))
+                    field = BusinessOrderCounter.count_field(row["status"])
+                    if hasattr(counter, field):
+                        setattr(counter, field, getattr(counter, field) + row["count"])
+
+            BusinessOrderCounter.objects.all().delete()
+            BusinessOrderCounter.objects.bulk_create(
+                counters.values(), batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt order counters for {len(counters)} business users."))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.2 on 2026-10-18 04:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Fills the counters from the existing orders.
+    """
+    OrderMainModel = apps.get_model('orders_app', 'OrderMainModel')
+    BusinessOrderCounter = apps.get_model('orders_app', 'BusinessOrderCounter')
+    counters = {}
+    rows = OrderMainModel.objects.values(
+        'business_user', 'status').annotate(count=Count('id')).order_by()
+    for row in rows:
+        counter = counters.setdefault(
+            row['business_user'],
+            BusinessOrderCounter(business_user_id=row['business_user']))
+        field = f"{row['status']}_count"
+        if hasattr(counter, field):
+            setattr(counter, field, row['count'])
+    BusinessOrderCounter.objects.bulk_create(counters.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('orders_app', '0005_order_user_created_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessOrderCounter',
+            fields=[
+                ('business_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('in_progress_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('cancelled_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
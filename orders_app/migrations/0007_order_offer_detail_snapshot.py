@@ -0,0 +1,65 @@
+# Generated by Django 5.2.2 on 2026-10-18 04:53
+
+from django.db import migrations, models
+
+
+SNAPSHOT_FIELDS = (
+    'title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type')
+
+
+def backfill_snapshots(apps, schema_editor):
+    """
+    Copies the current offer detail data onto all existing orders.
+    """
+    OrderMainModel = apps.get_model('orders_app', 'OrderMainModel')
+    batch = []
+    orders = OrderMainModel.objects.select_related('offer_detail')
+    for order in orders.iterator(chunk_size=1000):
+        for field in SNAPSHOT_FIELDS:
+            setattr(order, field, getattr(order.offer_detail, field))
+        batch.append(order)
+        if len(batch) >= 1000:
+            OrderMainModel.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+            batch = []
+    OrderMainModel.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders_app', '0006_businessordercounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordermainmodel',
+            name='delivery_time_in_days',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ordermainmodel',
+            name='features',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='ordermainmodel',
+            name='offer_type',
+            field=models.CharField(default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='ordermainmodel',
+            name='price',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='ordermainmodel',
+            name='revisions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ordermainmodel',
+            name='title',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.2 on 2026-10-18 04:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0009_offer_list_indexes'),
+        ('orders_app', '0007_order_offer_detail_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ordermainmodel',
+            index=models.Index(fields=['customer_user', 'updated_at'], name='order_customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordermainmodel',
+            index=models.Index(fields=['business_user', 'updated_at'], name='order_business_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='deletedorder',
+            name='business_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deleted_orders_as_business', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='deletedorder',
+            name='customer_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deleted_orders_as_customer', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='deletedorder',
+            index=models.Index(fields=['customer_user', 'deleted_at'], name='deletedorder_customer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deletedorder',
+            index=models.Index(fields=['business_user', 'deleted_at'], name='deletedorder_business_idx'),
+        ),
+    ]
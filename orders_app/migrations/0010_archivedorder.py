@@ -0,0 +1,39 @@
+# Generated by Django 5.2.2 on 2026-10-18 04:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0009_offer_list_indexes'),
+        ('orders_app', '0009_orderidempotencykey'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(default='', max_length=255)),
+                ('revisions', models.IntegerField(default=0)),
+                ('delivery_time_in_days', models.IntegerField(default=0)),
+                ('price', models.DecimalField(decimal_places=0, default=0, max_digits=10)),
+                ('features', models.JSONField(default=list)),
+                ('offer_type', models.CharField(default='', max_length=50)),
+                ('status', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('business_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders_as_business', to=settings.AUTH_USER_MODEL)),
+                ('customer_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders_as_customer', to=settings.AUTH_USER_MODEL)),
+                ('offer_detail', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='offers_app.offerdetail')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer_user', 'created_at'], name='archivedorder_customer_idx'), models.Index(fields=['business_user', 'created_at'], name='archivedorder_business_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,19 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
 from offers_app.models import OfferDetail
+from notifications_app.outbox import publish_many
+
+
+# Valid values of OrderMainModel.status
+ORDER_STATUSES = ("in_progress", "completed", "cancelled")
+
+# Allowed status transitions: new status -> statuses it may be reached from
+ORDER_STATUS_TRANSITIONS = {
+    "completed": ("in_progress",),
+    "cancelled": ("in_progress",),
+}
 
 
 class OrderMainModel(models.Model):
@@ -21,6 +34,15 @@ class OrderMainModel(models.Model):
     # The specific offer detail that was ordered
     offer_detail = models.ForeignKey(OfferDetail, on_delete=models.CASCADE)
 
+    # Snapshot of the offer detail at purchase time, so later edits of the
+    # tier do not change past orders and reads need no join
+    title = models.CharField(max_length=255, default="")
+    revisions = models.IntegerField(default=0)
+    delivery_time_in_days = models.IntegerField(default=0)
+    price = models.DecimalField(max_digits=10, decimal_places=0, default=0)
+    features = models.JSONField(default=list)
+    offer_type = models.CharField(max_length=50, default="")
+
     # The current status of the order (e.g., in_progress, completed, cancelled)
     status = models.CharField(max_length=50, default="in_progress")
 
@@ -29,3 +51,300 @@ class OrderMainModel(models.Model):
 
     # Timestamp when the order was last updated
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Offer detail fields copied onto the order when it is placed
+    SNAPSHOT_FIELDS = (
+        "title",
+        "revisions",
+        "delivery_time_in_days",
+        "price",
+        "features",
+        "offer_type",
+    )
+
+    @classmethod
+    def change_status(cls, business_user_id, order_ids, new_status):
+        """
+        Moves the given orders of a business user to new_status. The orders
+        whose current status allows the transition are locked first, then
+        exactly those rows are updated, so concurrent changes can never be
+        lost or skip the state machine.
+        Returns the ids of the orders that actually changed.
+        """
+        allowed_from = ORDER_STATUS_TRANSITIONS.get(new_status, ())
+        with transaction.atomic():
+            orders = list(cls.objects.select_for_update().filter(
+                id__in=order_ids,
+                business_user_id=business_user_id,
+                status__in=allowed_from,
+            ).only("id", "status", "customer_user_id", "business_user_id").order_by("id"))
+            if not orders:
+                return []
+
+            changed_at = timezone.now()
+            for old_status in allowed_from:
+                ids = [order.id for order in orders if order.status == old_status]
+                if not ids:
+                    continue
+                cls.objects.filter(id__in=ids).update(
+                    status=new_status, updated_at=changed_at)
+                BusinessOrderCounter.apply(
+                    business_user_id, {old_status: -len(ids), new_status: len(ids)})
+
+            for order in orders:
+                order.status = new_status
+                order.updated_at = changed_at
+            publish_many("order.status_changed", [
+                order.event_payload(order.customer_user_id) for order in orders
+            ])
+            return [order.id for order in orders]
+
+    @classmethod
+    def delete_orders(cls, order_ids):
+        """
+        Deletes the given orders, leaves a DeletedOrder tombstone for each and
+        updates the business counters. The orders are locked and read inside
+        the transaction, so the counters see the status that is deleted.
+        Returns the ids of the orders that were deleted.
+        """
+        with transaction.atomic():
+            orders = list(cls.objects.select_for_update().filter(
+                id__in=order_ids,
+            ).only("id", "status", "customer_user_id", "business_user_id").order_by("id"))
+            if not orders:
+                return []
+
+            DeletedOrder.objects.bulk_create([
+                DeletedOrder(
+                    order_id=order.id,
+                    customer_user_id=order.customer_user_id,
+                    business_user_id=order.business_user_id,
+                )
+                for order in orders
+            ])
+            cls.objects.filter(id__in=[order.id for order in orders]).delete()
+
+            changes = {}
+            for order in orders:
+                business_changes = changes.setdefault(order.business_user_id, {})
+                business_changes[order.status] = business_changes.get(order.status, 0) - 1
+            for business_user_id, business_changes in changes.items():
+                BusinessOrderCounter.apply(business_user_id, business_changes)
+            return [order.id for order in orders]
+
+    def event_payload(self, recipient_id):
+        """
+        Returns the outbox event payload describing this order.
+        """
+        return {
+            "order_id": self.id,
+            "customer_user": self.customer_user_id,
+            "business_user": self.business_user_id,
+            "status": self.status,
+            "recipient_id": recipient_id,
+        }
+
+    @classmethod
+    def snapshot(cls, offer_detail):
+        """
+        Returns the snapshot field values for an offer detail.
+        """
+        return {field: getattr(offer_detail, field) for field in cls.SNAPSHOT_FIELDS}
+
+    class Meta:
+        # Per-role indexes for the UNION branches of the order list
+        indexes = [
+            models.Index(fields=["customer_user", "created_at"],
+                         name="order_customer_created_idx"),
+            models.Index(fields=["business_user", "created_at"],
+                         name="order_business_created_idx"),
+            # Per-role indexes for incremental sync (?updated_since=)
+            models.Index(fields=["customer_user", "updated_at"],
+                         name="order_customer_updated_idx"),
+            models.Index(fields=["business_user", "updated_at"],
+                         name="order_business_updated_idx"),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """
+    Closed order moved out of OrderMainModel by the archive_orders command.
+    Keeps the id and all fields of the original order, so the hot table and
+    its indexes only hold recent and active orders.
+    """
+
+    # Id of the order in OrderMainModel (kept unchanged)
+    id = models.BigIntegerField(primary_key=True)
+
+    # The user who placed the order (the customer)
+    customer_user = models.ForeignKey(
+        User, related_name="archived_orders_as_customer", on_delete=models.CASCADE
+    )
+
+    # The user who received the order (the business/freelancer)
+    business_user = models.ForeignKey(
+        User, related_name="archived_orders_as_business", on_delete=models.CASCADE
+    )
+
+    # The offer detail that was ordered
+    offer_detail = models.ForeignKey(
+        OfferDetail, related_name="archived_orders", on_delete=models.CASCADE
+    )
+
+    # Snapshot of the offer detail at purchase time
+    title = models.CharField(max_length=255, default="")
+    revisions = models.IntegerField(default=0)
+    delivery_time_in_days = models.IntegerField(default=0)
+    price = models.DecimalField(max_digits=10, decimal_places=0, default=0)
+    features = models.JSONField(default=list)
+    offer_type = models.CharField(max_length=50, default="")
+
+    # The final status of the order (completed or cancelled)
+    status = models.CharField(max_length=50)
+
+    # Timestamps copied from the original order
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    # Timestamp when the order was archived
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    # Fields copied from OrderMainModel when an order is archived
+    COPY_FIELDS = (
+        "id",
+        "customer_user_id",
+        "business_user_id",
+        "offer_detail_id",
+        *OrderMainModel.SNAPSHOT_FIELDS,
+        "status",
+        "created_at",
+        "updated_at",
+    )
+
+    @classmethod
+    def from_order(cls, order):
+        """
+        Returns an unsaved archive row for an order.
+        """
+        return cls(**{field: getattr(order, field) for field in cls.COPY_FIELDS})
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer_user", "created_at"],
+                         name="archivedorder_customer_idx"),
+            models.Index(fields=["business_user", "created_at"],
+                         name="archivedorder_business_idx"),
+        ]
+
+
+class DeletedOrder(models.Model):
+    """
+    Tombstone of a deleted order, so clients syncing with ?updated_since=
+    learn about deletions.
+    """
+
+    # Id of the deleted order
+    order_id = models.BigIntegerField()
+
+    # The customer of the deleted order
+    customer_user = models.ForeignKey(
+        User, related_name="deleted_orders_as_customer", on_delete=models.CASCADE
+    )
+
+    # The business user of the deleted order
+    business_user = models.ForeignKey(
+        User, related_name="deleted_orders_as_business", on_delete=models.CASCADE
+    )
+
+    # Timestamp when the order was deleted
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer_user", "deleted_at"],
+                         name="deletedorder_customer_idx"),
+            models.Index(fields=["business_user", "deleted_at"],
+                         name="deletedorder_business_idx"),
+        ]
+
+
+class BusinessOrderCounter(models.Model):
+    """
+    Maintained order counts per business user and status.
+    Updated in the same transaction as every order write, so the count
+    endpoints need a single primary key lookup instead of a COUNT(*).
+    """
+
+    # The business user the counts belong to
+    business_user = models.OneToOneField(
+        User, primary_key=True, related_name="order_counter", on_delete=models.CASCADE
+    )
+
+    # Number of orders with status in_progress
+    in_progress_count = models.IntegerField(default=0)
+
+    # Number of orders with status completed
+    completed_count = models.IntegerField(default=0)
+
+    # Number of orders with status cancelled
+    cancelled_count = models.IntegerField(default=0)
+
+    @staticmethod
+    def count_field(status):
+        return f"{status}_count"
+
+    @classmethod
+    def apply(cls, business_user_id, changes):
+        """
+        Adds the given per-status deltas, e.g. {"in_progress": -1, "completed": 1},
+        to the counters of a business user. Unknown statuses are ignored.
+        Must run inside the transaction that changes the orders.
+        """
+        updates = {
+            cls.count_field(status): models.F(cls.count_field(status)) + delta
+            for status, delta in changes.items()
+            if delta and hasattr(cls, cls.count_field(status))
+        }
+        if not updates:
+            return
+        cls.objects.get_or_create(business_user_id=business_user_id)
+        cls.objects.filter(business_user_id=business_user_id).update(**updates)
+
+
+class OrderIdempotencyKey(models.Model):
+    """
+    Stores the response of an order creation under the client's Idempotency-Key,
+    so a retried request gets the original response instead of a duplicate order.
+    """
+
+    # The user who sent the request (keys are unique per user)
+    user = models.ForeignKey(
+        User, related_name="order_idempotency_keys", on_delete=models.CASCADE
+    )
+
+    # The Idempotency-Key header sent by the client
+    key = models.CharField(max_length=255)
+
+    # SHA-256 of the request body, to detect a key reused for another request
+    request_hash = models.CharField(max_length=64)
+
+    # The order created by the original request
+    order = models.ForeignKey(
+        OrderMainModel, null=True, blank=True, on_delete=models.SET_NULL
+    )
+
+    # Status code and body of the original response
+    response_status = models.IntegerField()
+    response_body = models.JSONField()
+
+    # Timestamp when the key was stored
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Timestamp after which the key may be purged
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="unique_order_idempotency_key"),
+        ]
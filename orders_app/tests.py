@@ -1,3 +1,683 @@
-from django.test import TestCase
+import csv
+import json
+import tracemalloc
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.testing import (
+    NO_CACHE, benchmark, benchmark_size, create_offer_detail, create_user, encode_cursor,
+    measure, report_rows_per_second,
+)
+from orders_app.api.serializers import OrderGetCompiledSerializer, OrderGetResponseSerializer
+from orders_app.admin import OrderAdmin
+from orders_app.models import (
+    ORDER_STATUS_TRANSITIONS, ArchivedOrder, BusinessOrderCounter, DeletedOrder, OrderMainModel,
+)
+
+
+@override_settings(CACHES=NO_CACHE)
+class OrderListTests(TestCase):
+    """
+    Tests for GET /api/orders/.
+    """
+
+    def setUp(self):
+        self.business, self.business_client = create_user("business", "business")
+        self.customer, self.client = create_user("customer", "customer")
+        detail = create_offer_detail(self.business)
+        for _ in range(5):
+            response = self.client.post(
+                "/api/orders/", {"offer_detail_id": detail.id}, format="json")
+            self.assertEqual(response.status_code, 201)
+
+    def test_compiled_serializer_matches_model_serializer(self):
+        OrderMainModel.objects.filter(id=OrderMainModel.objects.first().id).update(
+            status="completed", features=[])
+        for url in ("/api/orders/", "/api/orders/?pagination=cursor&page_size=2"):
+            with self.subTest(url=url):
+                expected = self.client.get(url).json()
+                with override_settings(COMPILED_READ_SERIALIZERS=True):
+                    self.assertEqual(self.client.get(url).json(), expected)
+
+    def walk_cursor_pages(self, client, url):
+        """
+        Follows the next links from url and returns the ids of all pages.
+        """
+        ids = []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [order["id"] for order in response.json()["results"]]
+            url = response.json()["next"]
+        return ids
+
+    def test_list_is_one_query_however_many_orders(self):
+        detail = create_offer_detail(self.business)
+        OrderMainModel.objects.bulk_create(
+            [OrderMainModel(customer_user=self.customer, business_user=self.business,
+                            offer_detail=detail, title="Basic", price=100)
+             for _ in range(1200)],
+            batch_size=500,
+        )
+        for compiled in (False, True):
+            with self.subTest(compiled=compiled), \
+                    override_settings(COMPILED_READ_SERIALIZERS=compiled):
+                # Token, UNION of the customer and business orders
+                with self.assertNumQueries(2):
+                    response = self.client.get("/api/orders/")
+                self.assertEqual(len(response.json()), 1205)
+                with self.assertNumQueries(2):
+                    response = self.business_client.get("/api/orders/?pagination=cursor")
+                self.assertEqual(len(response.json()["results"]), 20)
+
+    def test_cursor_pages_cover_every_order_once_in_order(self):
+        expected = list(OrderMainModel.objects.order_by(
+            "-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(
+            self.walk_cursor_pages(self.business_client, "/api/orders/?pagination=cursor&page_size=2"),
+            expected)
+        self.assertEqual(
+            [order["id"] for order in self.client.get("/api/orders/").json()], expected)
+
+    def test_filters_by_status_and_role(self):
+        order_id = OrderMainModel.objects.first().id
+        OrderMainModel.change_status(self.business.id, [order_id], "completed")
+        response = self.client.get("/api/orders/", {"status": "completed"})
+        self.assertEqual([order["id"] for order in response.json()], [order_id])
+        self.assertEqual(self.client.get("/api/orders/", {"role": "business"}).json(), [])
+        self.assertEqual(len(self.business_client.get("/api/orders/", {"role": "business"}).json()), 5)
+        self.assertEqual(self.client.get("/api/orders/", {"status": "bogus"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/orders/", {"role": "admin"}).status_code, 400)
+
+    def test_own_orders_are_listed_once(self):
+        detail = create_offer_detail(self.business)
+        OrderMainModel.objects.create(
+            customer_user=self.business, business_user=self.business, offer_detail=detail)
+        response = self.business_client.get("/api/orders/")
+        self.assertEqual(len(response.json()), 6)
+
+    def test_invalid_cursor_returns_404(self):
+        for values in (["abc", 1], [None, 1], ["2020-01-01T00:00:00Z", "x"]):
+            with self.subTest(values=values):
+                response = self.client.get(
+                    f"/api/orders/?pagination=cursor&cursor={encode_cursor(values)}")
+                self.assertEqual(response.status_code, 404)
+
+    def test_invalid_updated_since_returns_400(self):
+        for value in ("2020-13-45T00:00:00", "2020-02-30T10:00:00", "garbage"):
+            with self.subTest(value=value):
+                response = self.client.get("/api/orders/", {"updated_since": value})
+                self.assertEqual(response.status_code, 400)
+
+    def test_sync_returns_changed_orders_and_tombstones(self):
+        response = self.client.get("/api/orders/", {"updated_since": "2000-01-01T00:00:00Z"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["orders"]), 5)
+        sync_token = response.json()["sync_token"]
+
+        order_id, changed_id = OrderMainModel.objects.order_by("id").values_list(
+            "id", flat=True)[:2]
+        OrderMainModel.change_status(self.business.id, [changed_id], "completed")
+        admin = User.objects.create_superuser("admin", "admin@example.com", "pw12345678")
+        admin_client = APIClient()
+        admin_client.force_authenticate(admin)
+        self.assertEqual(admin_client.delete(f"/api/orders/{order_id}/").status_code, 204)
+        response = self.client.get("/api/orders/", {"sync_token": sync_token})
+        self.assertEqual([order["id"] for order in response.json()["orders"]], [changed_id])
+        self.assertEqual(response.json()["orders"][0]["status"], "completed")
+        self.assertEqual(response.json()["deleted"], [order_id])
+
+
+@override_settings(CACHES=NO_CACHE)
+class BusinessOrderCounterTests(TestCase):
+    """
+    Tests that BusinessOrderCounter follows every way an order is created,
+    changed or deleted.
+    """
+
+    def setUp(self):
+        self.business, self.business_client = create_user("business", "business")
+        self.other_business, _ = create_user("other", "business")
+        self.customer, self.client = create_user("customer", "customer")
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "pw12345678")
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(self.admin)
+        self.detail = create_offer_detail(self.business)
+        self.order_ids = [
+            self.client.post(
+                "/api/orders/", {"offer_detail_id": self.detail.id}, format="json").json()["id"]
+            for _ in range(3)
+        ]
+
+    def assertCountersMatchOrders(self):
+        for business in (self.business, self.other_business):
+            counter = BusinessOrderCounter.objects.filter(business_user=business).first()
+            for status in ("in_progress", "completed", "cancelled"):
+                expected = OrderMainModel.objects.filter(
+                    business_user=business, status=status).count()
+                actual = getattr(counter, f"{status}_count") if counter else 0
+                self.assertEqual(actual, expected, (business.username, status))
+
+    def test_counters_follow_api_changes(self):
+        self.assertCountersMatchOrders()
+        self.business_client.patch(
+            f"/api/orders/{self.order_ids[0]}/", {"status": "completed"}, format="json")
+        self.assertCountersMatchOrders()
+        self.assertEqual(
+            self.client.get(f"/api/order-count/{self.business.id}/").json()["order_count"], 2)
+        self.assertEqual(self.client.get(
+            f"/api/completed-order-count/{self.business.id}/").json()["completed_order_count"], 1)
+
+        response = self.admin_client.delete(f"/api/orders/{self.order_ids[0]}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertCountersMatchOrders()
+        self.assertTrue(DeletedOrder.objects.filter(order_id=self.order_ids[0]).exists())
+        self.assertEqual(self.admin_client.delete(
+            f"/api/orders/{self.order_ids[0]}/").status_code, 404)
+
+    def test_delete_uses_the_current_status(self):
+        order_id = self.order_ids[0]
+        # Status changed after the client loaded the order
+        OrderMainModel.change_status(self.business.id, [order_id], "cancelled")
+        self.assertEqual(OrderMainModel.delete_orders([order_id, 999]), [order_id])
+        self.assertCountersMatchOrders()
+
+    def test_delete_requires_admin(self):
+        response = self.business_client.delete(f"/api/orders/{self.order_ids[0]}/")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(OrderMainModel.objects.count(), 3)
+
+    def test_counters_follow_admin_changes(self):
+        model_admin = OrderAdmin(OrderMainModel, site)
+        request = RequestFactory().post("/admin/")
+        request.user = self.admin
+
+        order = OrderMainModel.objects.get(id=self.order_ids[0])
+        order.status = "completed"
+        model_admin.save_model(request, order, None, change=True)
+        self.assertCountersMatchOrders()
+
+        order.business_user = self.other_business
+        model_admin.save_model(request, order, None, change=True)
+        self.assertCountersMatchOrders()
+
+        new_order = OrderMainModel(
+            customer_user=self.customer, business_user=self.business, offer_detail=self.detail)
+        model_admin.save_model(request, new_order, None, change=False)
+        self.assertCountersMatchOrders()
+
+        model_admin.delete_model(request, new_order)
+        model_admin.delete_queryset(
+            request, OrderMainModel.objects.filter(id__in=self.order_ids[:2]))
+        self.assertCountersMatchOrders()
+        self.assertEqual(
+            sorted(DeletedOrder.objects.values_list("order_id", flat=True)),
+            sorted([new_order.id, *self.order_ids[:2]]))
+
+
+@override_settings(CACHES=NO_CACHE)
+class OrderStatsTests(TestCase):
+    """
+    Tests for GET /api/order-stats/.
+    """
+
+    def setUp(self):
+        self.business, self.business_client = create_user("business", "business")
+        self.idle_business, _ = create_user("idle", "business")
+        self.customer, self.client = create_user("customer", "customer")
+        detail = create_offer_detail(self.business)
+        order_ids = [
+            self.client.post(
+                "/api/orders/", {"offer_detail_id": detail.id}, format="json").json()["id"]
+            for _ in range(3)
+        ]
+        OrderMainModel.change_status(self.business.id, order_ids[:1], "completed")
+        OrderMainModel.change_status(self.business.id, order_ids[1:2], "cancelled")
+
+    def test_returns_counts_per_business_in_one_query(self):
+        ids = f"{self.business.id},{self.idle_business.id},{self.business.id}"
+        # Token, counters
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/order-stats/", {"business_ids": ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {"business_user": self.business.id,
+             "in_progress": 1, "completed": 1, "cancelled": 1},
+            {"business_user": self.idle_business.id,
+             "in_progress": 0, "completed": 0, "cancelled": 0},
+        ])
+
+    def test_matches_the_per_user_endpoints(self):
+        stats = self.client.get(
+            "/api/order-stats/", {"business_ids": str(self.business.id)}).json()[0]
+        self.assertEqual(
+            self.client.get(f"/api/order-count/{self.business.id}/").json()["order_count"],
+            stats["in_progress"])
+        self.assertEqual(self.client.get(
+            f"/api/completed-order-count/{self.business.id}/").json()["completed_order_count"],
+            stats["completed"])
+
+    @override_settings(ORDER_STATS_MAX_IDS=2)
+    def test_invalid_business_ids_return_400(self):
+        for ids in ("", "1,x", "1,2,3"):
+            with self.subTest(ids=ids):
+                response = self.client.get("/api/order-stats/", {"business_ids": ids})
+                self.assertEqual(response.status_code, 400)
+
+    def test_requires_authentication(self):
+        response = APIClient().get("/api/order-stats/", {"business_ids": str(self.business.id)})
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(CACHES=NO_CACHE)
+class OrderStatusTransitionTests(TestCase):
+    """
+    Tests for ORDER_STATUS_TRANSITIONS and OrderMainModel.change_status.
+    """
+
+    def setUp(self):
+        self.business, self.business_client = create_user("business", "business")
+        self.other_business, self.other_client = create_user("other", "business")
+        self.customer, self.client = create_user("customer", "customer")
+        detail = create_offer_detail(self.business)
+        self.order_ids = [
+            self.client.post(
+                "/api/orders/", {"offer_detail_id": detail.id}, format="json").json()["id"]
+            for _ in range(3)
+        ]
+
+    def test_transitions(self):
+        self.assertEqual(ORDER_STATUS_TRANSITIONS, {
+            "completed": ("in_progress",),
+            "cancelled": ("in_progress",),
+        })
+
+    def test_change_status_updates_only_allowed_orders(self):
+        first, second, third = self.order_ids
+        changed = OrderMainModel.change_status(self.business.id, [first], "completed")
+        self.assertEqual(changed, [first])
+
+        # completed -> cancelled is not allowed; unknown ids are ignored
+        changed = OrderMainModel.change_status(
+            self.business.id, [first, second, 999], "cancelled")
+        self.assertEqual(changed, [second])
+        self.assertEqual(OrderMainModel.change_status(
+            self.business.id, [third], "in_progress"), [])
+
+        statuses = dict(OrderMainModel.objects.values_list("id", "status"))
+        self.assertEqual(statuses, {
+            first: "completed", second: "cancelled", third: "in_progress"})
+        counter = BusinessOrderCounter.objects.get(business_user=self.business)
+        self.assertEqual(
+            (counter.in_progress_count, counter.completed_count, counter.cancelled_count),
+            (1, 1, 1))
+
+    def test_change_status_ignores_orders_of_other_businesses(self):
+        changed = OrderMainModel.change_status(
+            self.other_business.id, self.order_ids, "completed")
+        self.assertEqual(changed, [])
+        self.assertFalse(OrderMainModel.objects.exclude(status="in_progress").exists())
+
+    def test_patch_status(self):
+        order_id = self.order_ids[0]
+        url = f"/api/orders/{order_id}/"
+        self.assertEqual(self.business_client.patch(
+            "/api/orders/999/", {"status": "bogus"}, format="json").status_code, 404)
+        self.assertEqual(self.other_client.patch(
+            url, {"status": "completed"}, format="json").status_code, 401)
+        self.assertEqual(self.business_client.patch(
+            url, {"title": "x"}, format="json").status_code, 400)
+
+        response = self.business_client.patch(url, {"status": "completed"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "completed")
+        # Repeating the same transition is a no-op, going back is rejected
+        self.assertEqual(self.business_client.patch(
+            url, {"status": "completed"}, format="json").status_code, 200)
+        self.assertEqual(self.business_client.patch(
+            url, {"status": "in_progress"}, format="json").status_code, 400)
+
+    def test_bulk_status(self):
+        first, second, third = self.order_ids
+        OrderMainModel.change_status(self.business.id, [first], "completed")
+        response = self.business_client.post(
+            "/api/orders/bulk-status/",
+            {"order_ids": [first, second, third, 999], "status": "cancelled"},
+            format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated_ids"], [second, third])
+        self.assertEqual(self.client.post(
+            "/api/orders/bulk-status/", {"order_ids": [first], "status": "cancelled"},
+            format="json").status_code, 403)
+
+
+@override_settings(CACHES=NO_CACHE)
+class OrderIdempotencyTests(TestCase):
+    """
+    Tests for the Idempotency-Key header of POST /api/orders/.
+    """
+
+    def setUp(self):
+        business, _ = create_user("business", "business")
+        self.customer, self.client = create_user("customer", "customer")
+        self.other_customer, self.other_client = create_user("other", "customer")
+        self.detail = create_offer_detail(business)
+        self.other_detail = create_offer_detail(business, price=200)
+
+    def post(self, client, key, detail):
+        return client.post("/api/orders/", {"offer_detail_id": detail.id},
+                           format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_original_response(self):
+        first = self.post(self.client, "order-1", self.detail)
+        self.assertEqual(first.status_code, 201)
+        retry = self.post(self.client, "order-1", self.detail)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(OrderMainModel.objects.count(), 1)
+
+    def test_key_reused_for_a_different_body_returns_422(self):
+        self.post(self.client, "order-1", self.detail)
+        response = self.post(self.client, "order-1", self.other_detail)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(OrderMainModel.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        self.post(self.client, "order-1", self.detail)
+        response = self.post(self.other_client, "order-1", self.other_detail)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(OrderMainModel.objects.count(), 2)
+
+    @override_settings(ORDER_IDEMPOTENCY_KEY_TTL=0)
+    def test_expired_key_creates_a_new_order(self):
+        self.post(self.client, "order-1", self.detail)
+        response = self.post(self.client, "order-1", self.detail)
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(OrderMainModel.objects.count(), 2)
+
+    def test_invalid_key_returns_400(self):
+        for key in ("", "k" * 256):
+            with self.subTest(length=len(key)):
+                self.assertEqual(self.post(self.client, key, self.detail).status_code, 400)
+        self.assertFalse(OrderMainModel.objects.exists())
+
+
+@override_settings(CACHES=NO_CACHE)
+class ArchiveOrdersTests(TestCase):
+    """
+    Tests for the archive_orders command and reading archived orders.
+    """
+
+    def setUp(self):
+        self.business, self.business_client = create_user("business", "business")
+        self.customer, self.client = create_user("customer", "customer")
+        detail = create_offer_detail(self.business)
+        self.order_ids = [
+            self.client.post(
+                "/api/orders/", {"offer_detail_id": detail.id}, format="json").json()["id"]
+            for _ in range(4)
+        ]
+        old, closed_recently, open_old, _ = self.order_ids
+        OrderMainModel.change_status(self.business.id, [old, closed_recently], "completed")
+        OrderMainModel.objects.filter(id__in=[old, open_old]).update(
+            updated_at=timezone.now() - timedelta(days=400))
+
+    def archive(self, *args):
+        output = StringIO()
+        call_command("archive_orders", *args, stdout=output)
+        return output.getvalue()
+
+    def test_moves_only_old_closed_orders(self):
+        old = self.order_ids[0]
+        self.assertIn("Archived 1 orders.", self.archive("--older-than-days", "365"))
+        self.assertEqual(list(ArchivedOrder.objects.values_list("id", flat=True)), [old])
+        self.assertEqual(
+            sorted(OrderMainModel.objects.values_list("id", flat=True)), self.order_ids[1:])
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual((archived.status, archived.business_user_id),
+                         ("completed", self.business.id))
+        self.assertIn("Archived 0 orders.", self.archive("--older-than-days", "365"))
+
+    def test_moves_orders_in_batches(self):
+        OrderMainModel.change_status(self.business.id, self.order_ids, "cancelled")
+        OrderMainModel.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.assertIn("Archived 4 orders.",
+                      self.archive("--older-than-days", "1", "--batch-size", "3"))
+        self.assertFalse(OrderMainModel.objects.exists())
+
+    def test_include_archived_reads_both_tables(self):
+        self.archive("--older-than-days", "365")
+        old = self.order_ids[0]
+        listed = [order["id"] for order in self.client.get("/api/orders/").json()]
+        self.assertEqual(sorted(listed), self.order_ids[1:])
+
+        expected = self.client.get("/api/orders/").json()
+        response = self.client.get("/api/orders/", {"include_archived": "1"})
+        self.assertEqual(sorted(order["id"] for order in response.json()), self.order_ids)
+        archived = next(order for order in response.json() if order["id"] == old)
+        self.assertEqual(archived["status"], "completed")
+        self.assertEqual([order for order in response.json() if order["id"] != old], expected)
+
+    def test_counts_include_archived_orders(self):
+        self.archive("--older-than-days", "365")
+        response = self.client.get(f"/api/completed-order-count/{self.business.id}/")
+        self.assertEqual(response.json()["completed_order_count"], 2)
+        call_command("reconcile_order_counters", stdout=StringIO())
+        response = self.client.get(f"/api/completed-order-count/{self.business.id}/")
+        self.assertEqual(response.json()["completed_order_count"], 2)
+
+
+@override_settings(CACHES=NO_CACHE)
+class OrderExportTests(TestCase):
+    """
+    Tests for GET /api/orders/export/.
+    """
+
+    def setUp(self):
+        self.business, self.business_client = create_user("business", "business")
+        self.customer, self.client = create_user("customer", "customer")
+        self.detail = create_offer_detail(self.business)
+        for _ in range(3):
+            self.client.post("/api/orders/", {"offer_detail_id": self.detail.id}, format="json")
+
+    def export(self, query=""):
+        response = self.business_client.get(f"/api/orders/export/{query}")
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        rows = list(csv.DictReader(self.export().splitlines()))
+        self.assertEqual([int(row["id"]) for row in rows],
+                         list(OrderMainModel.objects.order_by("id").values_list("id", flat=True)))
+        self.assertEqual(json.loads(rows[0]["features"]), ["Logo"])
+        self.assertEqual(rows[0]["status"], "in_progress")
+
+    def test_ndjson_export(self):
+        lines = self.export("?format=ndjson").splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines],
+                         list(OrderMainModel.objects.order_by("id").values_list("id", flat=True)))
+
+    def test_date_bounds_and_archived_orders(self):
+        first, *rest = OrderMainModel.objects.order_by("id")
+        OrderMainModel.objects.filter(id=first.id).update(
+            status="completed", created_at=timezone.now() - timedelta(days=30),
+            updated_at=timezone.now() - timedelta(days=400))
+        call_command("archive_orders", stdout=StringIO())
+        self.assertTrue(ArchivedOrder.objects.filter(id=first.id).exists())
+
+        lines = self.export("?format=ndjson").splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines],
+                         [first.id] + [order.id for order in rest])
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        lines = self.export(f"?format=ndjson&created_after={since}").splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], [order.id for order in rest])
+
+    def test_invalid_date_bounds_return_400(self):
+        for value in ("2020-13-45", "2020-13-45T00:00:00", "x"):
+            with self.subTest(value=value):
+                response = self.business_client.get(
+                    "/api/orders/export/", {"created_after": value})
+                self.assertEqual(response.status_code, 400)
+
+    def test_requires_business_user(self):
+        self.assertEqual(self.client.get("/api/orders/export/").status_code, 403)
+
+    def export_peak_memory(self, order_count):
+        """
+        Creates orders up to order_count and returns the peak traced memory,
+        in bytes, of streaming the NDJSON export.
+        """
+        missing = order_count - OrderMainModel.objects.count()
+        OrderMainModel.objects.bulk_create(
+            [OrderMainModel(customer_user=self.customer, business_user=self.business,
+                            offer_detail=self.detail, title="Basic", price=100,
+                            features=["Logo"])
+             for _ in range(missing)],
+            batch_size=1000,
+        )
+        response = self.business_client.get("/api/orders/export/?format=ndjson")
+        tracemalloc.start()
+        try:
+            line_count = sum(chunk.count(b"\n") for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(line_count, order_count)
+        return peak
+
+    @override_settings(ORDER_EXPORT_CHUNK_SIZE=100)
+    def test_peak_memory_does_not_grow_with_order_count(self):
+        small_peak = self.export_peak_memory(500)
+        large_peak = self.export_peak_memory(10000)
+        # 20x the orders, but the same number of rows held at a time
+        self.assertLess(large_peak, small_peak * 2, (small_peak, large_peak))
+
+
+@benchmark
+class OrderSerializerBenchmark(TestCase):
+    """
+    Rows per second of the order list serializers, ModelSerializer vs compiled.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        business, _ = create_user("business", "business")
+        customer, _ = create_user("customer", "customer")
+        detail = create_offer_detail(business)
+        cls.order_count = benchmark_size(10000)
+        OrderMainModel.objects.bulk_create(
+            [OrderMainModel(customer_user=customer, business_user=business, offer_detail=detail,
+                            title="Basic", revisions=1, delivery_time_in_days=5, price=100,
+                            features=["Logo"], offer_type="basic")
+             for _ in range(cls.order_count)],
+            batch_size=1000,
+        )
+
+    def test_order_list_rows_per_second(self):
+        def model_serializer():
+            return OrderGetResponseSerializer(OrderMainModel.objects.all(), many=True).data
+
+        def compiled():
+            orders = OrderMainModel.objects.values(*OrderGetCompiledSerializer.value_lookups())
+            return OrderGetCompiledSerializer(orders).data
+
+        rates = report_rows_per_second("GET /api/orders/", self.order_count, {
+            "ModelSerializer": model_serializer, "compiled": compiled})
+        self.assertGreater(rates["compiled"], rates["ModelSerializer"])
+
+
+@benchmark
+@override_settings(CACHES=NO_CACHE)
+class OrderStatsBenchmark(TestCase):
+    """
+    Latency of one /api/order-stats/ call vs two per-user count calls per business.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        customer, _ = create_user("customer", "customer")
+        cls.business_ids = []
+        orders = []
+        for i in range(benchmark_size(50)):
+            business, _ = create_user(f"business{i}", "business")
+            detail = create_offer_detail(business)
+            cls.business_ids.append(business.id)
+            orders += [OrderMainModel(customer_user=customer, business_user=business,
+                                      offer_detail=detail, title="Basic", price=100)
+                       for _ in range(20)]
+        OrderMainModel.objects.bulk_create(orders, batch_size=1000)
+        call_command("reconcile_order_counters", stdout=StringIO())
+
+    def setUp(self):
+        _, self.client = create_user("viewer", "customer")
+
+    def test_order_stats_vs_per_user_endpoints(self):
+        def per_user():
+            for business_id in self.business_ids:
+                self.client.get(f"/api/order-count/{business_id}/")
+                self.client.get(f"/api/completed-order-count/{business_id}/")
+
+        def stats():
+            self.client.get(
+                "/api/order-stats/", {"business_ids": ",".join(map(str, self.business_ids))})
+
+        per_user_seconds, stats_seconds = measure(per_user), measure(stats)
+        print(f"\nOrder counts of {len(self.business_ids)} businesses: "
+              f"per-user endpoints {per_user_seconds * 1000:.1f} ms, "
+              f"order-stats {stats_seconds * 1000:.1f} ms")
+        self.assertLess(stats_seconds, per_user_seconds)
+
+
+@benchmark
+@override_settings(CACHES=NO_CACHE)
+class ArchiveOrdersBenchmark(TestCase):
+    """
+    Latency of the order list and count queries before and after archiving.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business, _ = create_user("business", "business")
+        customer, _ = create_user("customer", "customer")
+        detail = create_offer_detail(cls.business)
+        closed_count = benchmark_size(100000)
+        OrderMainModel.objects.bulk_create(
+            [OrderMainModel(customer_user=customer, business_user=cls.business,
+                            offer_detail=detail, title="Basic", price=100,
+                            status="completed" if i < closed_count else "in_progress")
+             for i in range(closed_count + benchmark_size(1000))],
+            batch_size=5000,
+        )
+        OrderMainModel.objects.filter(status="completed").update(
+            updated_at=timezone.now() - timedelta(days=400))
+
+    def setUp(self):
+        self.business_client = APIClient()
+        self.business_client.force_authenticate(self.business)
+
+    def measure_reads(self):
+        def page():
+            self.business_client.get("/api/orders/?pagination=cursor&status=in_progress")
+
+        def count():
+            OrderMainModel.objects.filter(business_user=self.business).count()
+
+        return measure(page), measure(count)
+
+    def test_reads_before_and_after_archiving(self):
+        page_before, count_before = self.measure_reads()
+        call_command("archive_orders", "--batch-size", "10000", stdout=StringIO())
+        page_after, count_after = self.measure_reads()
+        print(f"\nOrders of one business, {ArchivedOrder.objects.count()} archived: "
+              f"in-progress page {page_before * 1000:.1f} -> {page_after * 1000:.1f} ms, "
+              f"count {count_before * 1000:.1f} -> {count_after * 1000:.1f} ms")
+        self.assertLess(count_after, count_before)
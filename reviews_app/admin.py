@@ -1,5 +1,42 @@
 from django.contrib import admin
-from reviews_app.models import ReviewGetModel, ReviewPostModel, ReviewPatchDeleteModel
+from django.db import transaction
+from reviews_app.models import BusinessRatingSummary, ReviewGetModel, ReviewPostModel, ReviewPatchDeleteModel
+
+
+class RatingSummaryAdminMixin:
+    """
+    Keeps BusinessRatingSummary in step with reviews saved or deleted in the admin.
+    """
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            previous = None
+            if change:
+                previous = ReviewPostModel.objects.select_for_update().only(
+                    "business_user_id", "rating").get(pk=obj.pk)
+            super().save_model(request, obj, form, change)
+
+            if previous is None:
+                BusinessRatingSummary.apply(obj.business_user_id, added=[obj.rating])
+            elif (previous.business_user_id, previous.rating) != (obj.business_user_id, obj.rating):
+                BusinessRatingSummary.apply(previous.business_user_id, removed=[previous.rating])
+                BusinessRatingSummary.apply(obj.business_user_id, added=[obj.rating])
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, ReviewPostModel.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            reviews = list(ReviewPostModel.objects.select_for_update().filter(
+                pk__in=list(queryset.values_list("pk", flat=True))
+            ).order_by("pk").values_list("pk", "business_user_id", "rating"))
+            ReviewPostModel.objects.filter(pk__in=[pk for pk, _, _ in reviews]).delete()
+
+            removed = {}
+            for _, business_user_id, rating in reviews:
+                removed.setdefault(business_user_id, []).append(rating)
+            for business_user_id, ratings in removed.items():
+                BusinessRatingSummary.apply(business_user_id, removed=ratings)
 
 
 @admin.register(ReviewGetModel)
@@ -8,12 +45,12 @@ class ReviewGetAdmin(admin.ModelAdmin):
 
 
 @admin.register(ReviewPostModel)
-class ReviewPostAdmin(admin.ModelAdmin):
+class ReviewPostAdmin(RatingSummaryAdminMixin, admin.ModelAdmin):
     list_display = ("id", "reviewer", "business_user", "rating", "created_at")
     list_filter = ("rating",)
     search_fields = ("reviewer__username", "business_user__username")
 
 
 @admin.register(ReviewPatchDeleteModel)
-class ReviewPatchDeleteAdmin(admin.ModelAdmin):
+class ReviewPatchDeleteAdmin(RatingSummaryAdminMixin, admin.ModelAdmin):
     list_display = ("id", "reviewer", "business_user", "rating", "created_at")
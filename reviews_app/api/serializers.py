@@ -1,5 +1,6 @@
-from reviews_app.models import ReviewGetModel, ReviewPostModel, ReviewPatchDeleteModel
+from reviews_app.models import ReviewGetModel, ReviewPostModel, ReviewPatchDeleteModel, BusinessRatingSummary
 from rest_framework import serializers
+from core.serializers import CompiledReadSerializer, DATETIME
 
 
 class ReviewGetSerializer(serializers.ModelSerializer):
@@ -56,3 +57,40 @@ class ReviewPatchSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReviewPatchDeleteModel
         fields = ["rating", "description"]
+
+
+class ReviewCompiledSerializer(CompiledReadSerializer):
+    """
+    Compiled read serializer producing the same output as ReviewPostResponseSerializer
+    from `.values()` rows.
+    """
+    fields = (
+        ("id", "id", None),
+        ("business_user", "business_user", None),
+        ("reviewer", "reviewer", None),
+        ("rating", "rating", None),
+        ("description", "description", None),
+        ("created_at", "created_at", DATETIME),
+        ("updated_at", "updated_at", DATETIME),
+    )
+
+
+class BusinessRatingSummarySerializer(serializers.ModelSerializer):
+    """
+    Serializer for the maintained rating summary of a business user,
+    including the average rating and the 1-5 rating histogram.
+    """
+    average_rating = serializers.FloatField(read_only=True, allow_null=True)
+    histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = BusinessRatingSummary
+        fields = [
+            "business_user",
+            "review_count",
+            "rating_count",
+            "rating_sum",
+            "average_rating",
+            "histogram",
+        ]
@@ -1,11 +1,17 @@
 from django.urls import path
-from .views import ReviewGetPostView, ReviewPatchDeleteView, BaseInfoView
+from .views import ReviewGetPostView, ReviewPatchDeleteView, BaseInfoView, ReviewSummaryView, ReviewSummaryListView
 
 # URL patterns for handling reviews and general landing page statistics
 urlpatterns = [
     # Endpoint to list all reviews for the logged-in user and create new ones
     path("reviews/", ReviewGetPostView.as_view(), name="reviews"),
 
+    # Endpoint to get the rating summaries of many business users (?business_ids=)
+    path("reviews/summary/", ReviewSummaryListView.as_view(), name="review-summaries"),
+
+    # Endpoint to get the rating summary of a single business user
+    path("reviews/summary/<int:business_id>/", ReviewSummaryView.as_view(), name="review-summary"),
+
     # Endpoint to update or delete a specific review by ID (only by its author)
     path("reviews/<int:pk>/", ReviewPatchDeleteView.as_view(), name="review-detail"),
 
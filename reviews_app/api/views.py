@@ -3,23 +3,68 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
-from reviews_app.models import ReviewPatchDeleteModel, ReviewPostModel
-from .serializers import ReviewPostSerializer, ReviewPostResponseSerializer, ReviewPatchSerializer
-from django.db.models import Avg
+from reviews_app.models import ReviewPatchDeleteModel, ReviewPostModel, BusinessRatingSummary
+from .serializers import ReviewPostSerializer, ReviewPostResponseSerializer, ReviewPatchSerializer, ReviewCompiledSerializer, BusinessRatingSummarySerializer
+from core.serializers import use_compiled_serializers
+from core.pagination import KeysetPagination, get_pagination_mode
+from reviews_app.cache import get_base_info, invalidate_base_info
 from django.contrib.auth.models import User
-from offers_app.models import Offer
+from notifications_app.outbox import publish
+from django.db import IntegrityError, transaction
+from django.conf import settings
+
+
+class ReviewCursorPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+
+
+# Whitelisted ?ordering= values, each with the primary key as tiebreaker;
+# backed by the (business_user, ...) and (reviewer, updated_at) indexes
+REVIEW_ORDERINGS = {
+    "updated_at": ("updated_at", "id"),
+    "-updated_at": ("-updated_at", "-id"),
+    "rating": ("rating", "id"),
+    "-rating": ("-rating", "-id"),
+}
+
+
+def get_review_pagination(ordering):
+    """
+    Returns the keyset pagination for a whitelisted ordering. Its order_by()
+    arguments also sort the plain list, so NULL ratings come last in both modes.
+    """
+    return ReviewCursorPagination(
+        ordering=REVIEW_ORDERINGS[ordering], nullable_fields=("rating",))
+
+
+def publish_review_created(review):
+    """
+    Writes the review.created outbox event for a new review.
+    """
+    publish("review.created", {
+        "review_id": review.id,
+        "reviewer": review.reviewer_id,
+        "business_user": review.business_user_id,
+        "rating": review.rating,
+        "recipient_id": review.business_user_id,
+    })
 
 
 class ReviewGetPostView(APIView):
     """
-    API view for retrieving the reviews for the logged-in user and posting new reviews.
+    API view for retrieving the reviews for the logged-in user, posting new reviews
+    and upserting the user's review of a business user (PUT).
     """
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         """
-        Returns a list of all reviews. Can be filtered by business_user_id, reviewer_id and ordered by updated_at or rating.
+        Returns a list of all reviews. Can be filtered by business_user_id, reviewer_id and ordered by
+        updated_at or rating (ascending, or descending with a leading '-').
+        With ?pagination=cursor (or REVIEWS_PAGINATION = "cursor") the reviews are
+        returned in pages of {"next", "results"}, newest first by default.
         Only accessible to authenticated users.
         """
         # Grund-Queryset: alle Reviews aus der Datenbank
@@ -35,14 +80,33 @@ class ReviewGetPostView(APIView):
         if reviewer_id:
             queryset = queryset.filter(reviewer__id=reviewer_id)
 
-        # Optionales Sortieren nach einem Feld ('updated_at' oder 'rating')
+        if use_compiled_serializers():
+            queryset = queryset.values(*ReviewCompiledSerializer.value_lookups())
+
         ordering = request.query_params.get("ordering")
-        if ordering in ["updated_at", "rating"]:
-            queryset = queryset.order_by(ordering)
+
+        # Keyset-Pagination: Seiten über einen Cursor statt der kompletten Liste
+        if get_pagination_mode(request, "REVIEWS_PAGINATION", "list") == "cursor":
+            if ordering is None:
+                ordering = "-updated_at"
+            elif ordering not in REVIEW_ORDERINGS:
+                return Response({"detail": "Invalid ordering."}, status=400)
+            paginator = get_review_pagination(ordering)
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return paginator.get_paginated_response(self.serialize_reviews(page))
+
+        # Optionales Sortieren nach einem Feld ('updated_at' oder 'rating', absteigend mit '-')
+        if ordering in REVIEW_ORDERINGS:
+            queryset = queryset.order_by(*get_review_pagination(ordering).get_order_by())
 
         # Serialisieren und Rückgabe der (ggf. gefilterten) Liste
-        serializer = ReviewPostResponseSerializer(queryset, many=True)
-        return Response(serializer.data, status=200)
+        return Response(self.serialize_reviews(queryset), status=200)
+
+    @staticmethod
+    def serialize_reviews(reviews):
+        if use_compiled_serializers():
+            return ReviewCompiledSerializer(reviews).data
+        return ReviewPostResponseSerializer(reviews, many=True).data
 
     def post(self, request):
         """
@@ -63,13 +127,55 @@ class ReviewGetPostView(APIView):
             data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
     
-        # Save the review with the authenticated user as reviewer
-        review = serializer.save(reviewer=user)
+        # Save the review, its rating summary and its outbox event in one transaction
+        try:
+            with transaction.atomic():
+                review = serializer.save(reviewer=user)
+                BusinessRatingSummary.apply(
+                    review.business_user_id, added=[review.rating])
+                publish_review_created(review)
+        except IntegrityError:
+            return Response(
+                {"detail": "You have already reviewed this business user. Use PUT to update the review."},
+                status=400
+            )
 
         # Serialize and return the newly created review
         response_serializer = ReviewPostResponseSerializer(review)
         return Response(response_serializer.data, status=201)
 
+    def put(self, request):
+        """
+        Creates or replaces the logged-in customer's review of a business user
+        with a single upsert statement, which also returns the replaced rating
+        for the rating summary.
+        Returns 201 if the review was created, 200 if it was updated.
+        """
+        user = request.user
+        if not hasattr(user, "profile") or user.profile.type != "customer":
+            return Response({"detail": "Only customers can write reviews."}, status=403)
+
+        serializer = ReviewPostSerializer(
+            data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        business_user_id = data["business_user"].id
+
+        with transaction.atomic():
+            review, created = ReviewPostModel.upsert(
+                user.id, business_user_id, data.get("rating"), data.get("description"))
+            if created:
+                BusinessRatingSummary.apply(business_user_id, added=[review.rating])
+                publish_review_created(review)
+            else:
+                BusinessRatingSummary.apply(
+                    business_user_id, added=[review.rating], removed=[review.previous_rating])
+            # The raw upsert sends no post_save signal
+            transaction.on_commit(invalidate_base_info)
+
+        response_serializer = ReviewPostResponseSerializer(review)
+        return Response(response_serializer.data, status=201 if created else 200)
+
 
 class ReviewPatchDeleteView(APIView):
     """
@@ -82,16 +188,22 @@ class ReviewPatchDeleteView(APIView):
         """
         Partially updates a review by ID if the user is the author.
         """
-        try:
-            review = ReviewPatchDeleteModel.objects.get(
-                pk=pk, reviewer=request.user)
-        except ReviewPatchDeleteModel.DoesNotExist:
-            return Response({"detail": "Review not found."}, status=404)
+        with transaction.atomic():
+            try:
+                review = ReviewPatchDeleteModel.objects.select_for_update().get(
+                    pk=pk, reviewer=request.user)
+            except ReviewPatchDeleteModel.DoesNotExist:
+                return Response({"detail": "Review not found."}, status=404)
 
-        serializer = ReviewPatchSerializer(
-            review, data=request.data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        updated_review = serializer.save()
+            old_rating = review.rating
+            serializer = ReviewPatchSerializer(
+                review, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            updated_review = serializer.save()
+            if updated_review.rating != old_rating:
+                BusinessRatingSummary.apply(
+                    updated_review.business_user_id,
+                    added=[updated_review.rating], removed=[old_rating])
 
         response_serializer = ReviewPostResponseSerializer(updated_review)
         return Response(response_serializer.data, status=200)
@@ -100,13 +212,75 @@ class ReviewPatchDeleteView(APIView):
         """
         Deletes a review by ID if the user is the author.
         """
-        try:
-            review = ReviewPatchDeleteModel.objects.get(
-                pk=pk, reviewer=request.user)
+        with transaction.atomic():
+            try:
+                review = ReviewPatchDeleteModel.objects.select_for_update().get(
+                    pk=pk, reviewer=request.user)
+            except ReviewPatchDeleteModel.DoesNotExist:
+                return Response({"detail": "Review not found."}, status=404)
             review.delete()
-            return Response(status=204)
-        except ReviewPatchDeleteModel.DoesNotExist:
-            return Response({"detail": "Review not found."}, status=404)
+            BusinessRatingSummary.apply(
+                review.business_user_id, removed=[review.rating])
+        return Response(status=204)
+
+
+class ReviewSummaryView(APIView):
+    """
+    Returns the rating summary (count, average, histogram) of a business user.
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, business_id):
+        summary = BusinessRatingSummary.objects.filter(
+            business_user_id=business_id).first()
+        if summary is None:
+            # No summary yet: validate the user, a business without reviews has zeros
+            try:
+                user = User.objects.get(pk=business_id)
+            except User.DoesNotExist:
+                return Response({"detail": "Business user not found."}, status=404)
+
+            if not hasattr(user, "profile") or user.profile.type != "business":
+                return Response({"detail": "User exists but is not a business profile."}, status=400)
+
+            summary = BusinessRatingSummary(business_user_id=business_id)
+        return Response(BusinessRatingSummarySerializer(summary).data, status=200)
+
+
+class ReviewSummaryListView(APIView):
+    """
+    Returns the rating summaries of many business users at once.
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Expects ?business_ids=1,2,3. Reads all summaries in one indexed query;
+        users without reviews (or without a business profile) get zeros.
+        """
+        raw_ids = request.query_params.get("business_ids", "")
+        try:
+            business_ids = list(dict.fromkeys(
+                int(value) for value in raw_ids.split(",") if value.strip()))
+        except ValueError:
+            return Response({"detail": "business_ids must be a comma-separated list of integers."}, status=400)
+
+        if not business_ids:
+            return Response({"detail": "business_ids is required."}, status=400)
+
+        max_ids = getattr(settings, "REVIEW_SUMMARY_MAX_IDS", 100)
+        if len(business_ids) > max_ids:
+            return Response({"detail": f"At most {max_ids} business_ids are allowed."}, status=400)
+
+        summaries = BusinessRatingSummary.objects.in_bulk(business_ids)
+        results = [
+            summaries.get(business_id)
+            or BusinessRatingSummary(business_user_id=business_id)
+            for business_id in business_ids
+        ]
+        return Response(BusinessRatingSummarySerializer(results, many=True).data, status=200)
 
 
 class BaseInfoView(APIView):
@@ -119,18 +293,7 @@ class BaseInfoView(APIView):
 
     def get(self, request):
         """
-        Returns basic aggregated info for public display.
+        Returns basic aggregated info for public display, served from a
+        cached snapshot (see reviews_app.cache).
         """
-        review_count = ReviewPostModel.objects.count()
-        average_rating = ReviewPostModel.objects.aggregate(Avg("rating"))[
-            "rating__avg"] or 0.0
-        business_profile_count = User.objects.filter(
-            profile__type="business").count()
-        offer_count = Offer.objects.count()
-
-        return Response({
-            "review_count": review_count,
-            "average_rating": round(average_rating, 1),
-            "business_profile_count": business_profile_count,
-            "offer_count": offer_count
-        }, status=200)
+        return Response(get_base_info(), status=200)
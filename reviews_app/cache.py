@@ -0,0 +1,92 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+from auth_app.models import UserProfile
+from offers_app.models import Offer
+from reviews_app.models import BusinessRatingSummary
+
+
+# Cache key holding the last computed base-info snapshot (never expires)
+BASE_INFO_DATA_KEY = "base_info:data"
+
+# Cache key present while the snapshot is fresh (expires after the TTL)
+BASE_INFO_FRESH_KEY = "base_info:fresh"
+
+# Cache key held by the one request that recomputes the snapshot
+BASE_INFO_LOCK_KEY = "base_info:lock"
+
+# Seconds after which a lock of a crashed recomputation is released
+BASE_INFO_LOCK_TIMEOUT = 30
+
+# Seconds a request waits for another request's first computation
+BASE_INFO_WAIT_TIMEOUT = 5
+
+
+def get_base_info_timeout():
+    return getattr(settings, "BASE_INFO_CACHE_TIMEOUT", 60)
+
+
+def compute_base_info():
+    """
+    Computes the landing page statistics. Review count and average come
+    from the maintained rating summaries instead of a scan over all reviews.
+    """
+    totals = BusinessRatingSummary.objects.aggregate(
+        review_count=Sum("review_count"),
+        rating_count=Sum("rating_count"),
+        rating_sum=Sum("rating_sum"),
+    )
+    rating_count = totals["rating_count"] or 0
+    average_rating = totals["rating_sum"] / rating_count if rating_count else 0.0
+    return {
+        "review_count": totals["review_count"] or 0,
+        "average_rating": round(average_rating, 1),
+        "business_profile_count": UserProfile.objects.filter(type="business").count(),
+        "offer_count": Offer.objects.count(),
+    }
+
+
+def refresh_base_info():
+    data = compute_base_info()
+    cache.set(BASE_INFO_DATA_KEY, data, None)
+    cache.set(BASE_INFO_FRESH_KEY, True, get_base_info_timeout())
+    return data
+
+
+def get_base_info():
+    """
+    Returns the base-info snapshot. Misses are coalesced: only the request
+    holding the lock recomputes, others keep serving the stale snapshot
+    (or, on a cold cache, wait for the first computation to finish).
+    """
+    data = cache.get(BASE_INFO_DATA_KEY)
+    if data is not None and cache.get(BASE_INFO_FRESH_KEY):
+        return data
+
+    if cache.add(BASE_INFO_LOCK_KEY, True, BASE_INFO_LOCK_TIMEOUT):
+        try:
+            return refresh_base_info()
+        finally:
+            cache.delete(BASE_INFO_LOCK_KEY)
+
+    if data is not None:
+        return data
+
+    deadline = time.monotonic() + BASE_INFO_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        data = cache.get(BASE_INFO_DATA_KEY)
+        if data is not None:
+            return data
+    return compute_base_info()
+
+
+def invalidate_base_info():
+    """
+    Marks the snapshot as stale; the next request recomputes it while
+    concurrent requests are still served the previous snapshot.
+    """
+    cache.delete(BASE_INFO_FRESH_KEY)
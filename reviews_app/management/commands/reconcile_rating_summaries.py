@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews_app.models import ReviewPostModel, BusinessRatingSummary
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds all per-business rating summaries from the reviews table.
+    """
+    help = "Rebuilds all per-business rating summaries from the reviews table."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            summaries = BusinessRatingSummary.build(ReviewPostModel.objects.all())
+            BusinessRatingSummary.objects.all().delete()
+            BusinessRatingSummary.objects.bulk_create(
+                summaries.values(), batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rating summaries for {len(summaries)} business users."))
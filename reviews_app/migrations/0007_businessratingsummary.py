@@ -0,0 +1,54 @@
+# Generated by Django 5.2.2 on 2026-10-18 05:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_summaries(apps, schema_editor):
+    """
+    Fills the rating summaries from the existing reviews.
+    """
+    ReviewPostModel = apps.get_model('reviews_app', 'ReviewPostModel')
+    BusinessRatingSummary = apps.get_model('reviews_app', 'BusinessRatingSummary')
+    summaries = {}
+    rows = ReviewPostModel.objects.values(
+        'business_user', 'rating').annotate(count=Count('id')).order_by()
+    for row in rows:
+        summary = summaries.setdefault(
+            row['business_user'],
+            BusinessRatingSummary(business_user_id=row['business_user']))
+        summary.review_count += row['count']
+        if row['rating'] is not None:
+            summary.rating_count += row['count']
+            summary.rating_sum += row['rating'] * row['count']
+            field = f"rating_{row['rating']}_count"
+            setattr(summary, field, getattr(summary, field) + row['count'])
+    BusinessRatingSummary.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('reviews_app', '0006_reviewpatchdeletemodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessRatingSummary',
+            fields=[
+                ('business_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_1_count', models.IntegerField(default=0)),
+                ('rating_2_count', models.IntegerField(default=0)),
+                ('rating_3_count', models.IntegerField(default=0)),
+                ('rating_4_count', models.IntegerField(default=0)),
+                ('rating_5_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def dedupe_reviews(apps, schema_editor):
+    """
+    Keeps only the most recently updated review per reviewer and business user,
+    then recomputes the rating summaries of the affected business users.
+    """
+    ReviewPostModel = apps.get_model('reviews_app', 'ReviewPostModel')
+    BusinessRatingSummary = apps.get_model('reviews_app', 'BusinessRatingSummary')
+    pairs = ReviewPostModel.objects.values('reviewer', 'business_user').annotate(
+        count=Count('id')).filter(count__gt=1).order_by()
+
+    business_ids = set()
+    for pair in pairs:
+        ids = list(ReviewPostModel.objects.filter(
+            reviewer=pair['reviewer'], business_user=pair['business_user'],
+        ).order_by('-updated_at', '-id').values_list('id', flat=True))
+        ReviewPostModel.objects.filter(id__in=ids[1:]).delete()
+        business_ids.add(pair['business_user'])
+
+    for business_id in business_ids:
+        summary = BusinessRatingSummary(business_user_id=business_id)
+        rows = ReviewPostModel.objects.filter(business_user=business_id).values(
+            'rating').annotate(count=Count('id')).order_by()
+        for row in rows:
+            summary.review_count += row['count']
+            if row['rating'] is not None:
+                summary.rating_count += row['count']
+                summary.rating_sum += row['rating'] * row['count']
+                field = f"rating_{row['rating']}_count"
+                setattr(summary, field, getattr(summary, field) + row['count'])
+        summary.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews_app', '0008_review_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_reviews, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.2 on 2026-10-18 05:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews_app', '0009_dedupe_reviews'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='reviewpostmodel',
+            constraint=models.UniqueConstraint(fields=('reviewer', 'business_user'), name='unique_review_per_business'),
+        ),
+    ]
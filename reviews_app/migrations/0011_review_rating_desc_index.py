@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_rating_desc_index(apps, schema_editor):
+    """
+    Creates the index matching ordering=-rating, which is emitted as
+    DESC NULLS LAST. PostgreSQL sorts NULLs first in DESC indexes by default,
+    so the modifier is spelled out there; SQLite and MySQL sort NULLs lowest,
+    so a plain DESC index already has them last (and SQLite rejects the modifier).
+    """
+    nulls_last = " NULLS LAST" if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(
+        "CREATE INDEX review_business_rating_dsc_idx "
+        "ON reviews_app_reviewpostmodel "
+        f"(business_user_id, rating DESC{nulls_last}, id DESC)"
+    )
+
+
+def drop_rating_desc_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute(
+            "DROP INDEX review_business_rating_dsc_idx ON reviews_app_reviewpostmodel")
+    else:
+        schema_editor.execute("DROP INDEX IF EXISTS review_business_rating_dsc_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews_app', '0010_unique_review_per_business'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_rating_desc_index, drop_rating_desc_index),
+    ]
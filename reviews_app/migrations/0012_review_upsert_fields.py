@@ -0,0 +1,40 @@
+# Generated by Django 5.2.2 on 2026-10-18 05:55
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+rating_desc_index = import_module("reviews_app.migrations.0011_review_rating_desc_index")
+
+
+def recreate_rating_desc_index(apps, schema_editor):
+    """
+    SQLite adds and removes fields by rebuilding the table, which drops the
+    raw review_business_rating_dsc_idx from 0011, so it is created again
+    after the fields change in either direction.
+    """
+    rating_desc_index.drop_rating_desc_index(apps, schema_editor)
+    rating_desc_index.create_rating_desc_index(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews_app', '0011_review_rating_desc_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, recreate_rating_desc_index),
+        migrations.AddField(
+            model_name='reviewpostmodel',
+            name='previous_rating',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewpostmodel',
+            name='replaced',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(recreate_rating_desc_index, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import connection, models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 
 class ReviewGetModel(models.Model):
@@ -40,6 +41,54 @@ class ReviewPostModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     # Timestamp when the review was last updated
     updated_at = models.DateTimeField(auto_now=True)
+    # Whether a PUT has replaced the review (tells the upsert's update from its insert)
+    replaced = models.BooleanField(default=False, editable=False)
+    # Rating the review had before the last PUT replaced it
+    previous_rating = models.IntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # Indexes for the filtered and ordered review list
+        indexes = [
+            models.Index(fields=["business_user", "updated_at"],
+                         name="review_business_updated_idx"),
+            # Serves ordering=rating; ordering=-rating (DESC NULLS LAST) uses the
+            # vendor-specific review_business_rating_dsc_idx from migration 0011
+            models.Index(fields=["business_user", "rating"],
+                         name="review_business_rating_idx"),
+            models.Index(fields=["reviewer", "updated_at"],
+                         name="review_reviewer_updated_idx"),
+        ]
+        # A customer can review each business user only once
+        constraints = [
+            models.UniqueConstraint(
+                fields=["reviewer", "business_user"], name="unique_review_per_business"),
+        ]
+
+    @classmethod
+    def upsert(cls, reviewer_id, business_user_id, rating, description):
+        """
+        Inserts the review or replaces the reviewer's existing one with a single
+        INSERT ... ON CONFLICT DO UPDATE. The SET clause copies the replaced
+        rating into previous_rating, so RETURNING reports the old and the new
+        state of the row without reading it first.
+        Returns the review and whether it was created.
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = cls._meta.get_field("created_at").get_db_prep_value(
+            timezone.now(), connection)
+        sql = (
+            f"INSERT INTO {table} (reviewer_id, business_user_id, rating, description, "
+            "created_at, updated_at, replaced, previous_rating) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, NULL) "
+            "ON CONFLICT (reviewer_id, business_user_id) DO UPDATE SET "
+            f"previous_rating = {table}.rating, replaced = %s, "
+            "rating = EXCLUDED.rating, description = EXCLUDED.description, "
+            "updated_at = EXCLUDED.updated_at "
+            "RETURNING *"
+        )
+        params = [reviewer_id, business_user_id, rating, description, now, now, False, True]
+        review = list(cls.objects.raw(sql, params))[0]
+        return review, not review.replaced
 
 
 class ReviewPatchDeleteModel(ReviewPostModel):
@@ -49,3 +98,98 @@ class ReviewPatchDeleteModel(ReviewPostModel):
     """
     class Meta:
         proxy = True
+
+
+class BusinessRatingSummary(models.Model):
+    """
+    Maintained review aggregates per business user: review count, rating sum
+    and a 1-5 rating histogram. Updated in the same transaction as every
+    review write, so summaries and averages need no scan over the reviews.
+    """
+
+    # The business user the summary belongs to
+    business_user = models.OneToOneField(
+        User, primary_key=True, related_name="rating_summary", on_delete=models.CASCADE
+    )
+
+    # Number of reviews, with or without a rating
+    review_count = models.IntegerField(default=0)
+
+    # Number of reviews with a rating
+    rating_count = models.IntegerField(default=0)
+
+    # Sum of all ratings
+    rating_sum = models.IntegerField(default=0)
+
+    # Number of reviews per rating
+    rating_1_count = models.IntegerField(default=0)
+    rating_2_count = models.IntegerField(default=0)
+    rating_3_count = models.IntegerField(default=0)
+    rating_4_count = models.IntegerField(default=0)
+    rating_5_count = models.IntegerField(default=0)
+
+    @staticmethod
+    def rating_field(rating):
+        return f"rating_{rating}_count"
+
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 1)
+
+    @property
+    def histogram(self):
+        return {str(rating): getattr(self, self.rating_field(rating))
+                for rating in range(1, 6)}
+
+    @classmethod
+    def deltas(cls, added=(), removed=()):
+        """
+        Returns the field deltas for reviews added and removed, given as
+        their ratings (None for reviews without a rating).
+        """
+        deltas = {}
+        changes = [(rating, 1) for rating in added]
+        changes += [(rating, -1) for rating in removed]
+        for rating, sign in changes:
+            fields = ["review_count"]
+            if rating is not None:
+                fields += ["rating_count", cls.rating_field(rating)]
+                deltas["rating_sum"] = deltas.get("rating_sum", 0) + sign * rating
+            for field in fields:
+                deltas[field] = deltas.get(field, 0) + sign
+        return deltas
+
+    @classmethod
+    def apply(cls, business_user_id, added=(), removed=()):
+        """
+        Updates the summary of a business user for the added and removed
+        review ratings; a changed rating is one removal plus one addition.
+        Must run inside the transaction that changes the reviews.
+        """
+        updates = {
+            field: models.F(field) + delta
+            for field, delta in cls.deltas(added, removed).items()
+            if delta
+        }
+        if not updates:
+            return
+        cls.objects.get_or_create(business_user_id=business_user_id)
+        cls.objects.filter(business_user_id=business_user_id).update(**updates)
+
+    @classmethod
+    def build(cls, reviews):
+        """
+        Returns unsaved summaries computed from a review queryset,
+        keyed by business user id.
+        """
+        summaries = {}
+        rows = reviews.values("business_user", "rating").annotate(
+            count=models.Count("id")).order_by()
+        for row in rows:
+            summary = summaries.setdefault(
+                row["business_user"], cls(business_user_id=row["business_user"]))
+            for field, delta in cls.deltas(added=[row["rating"]]).items():
+                setattr(summary, field, getattr(summary, field) + delta * row["count"])
+        return summaries
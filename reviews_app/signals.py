@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from auth_app.models import UserProfile
+from offers_app.models import Offer
+from reviews_app.models import ReviewPostModel, ReviewPatchDeleteModel
+from reviews_app.cache import invalidate_base_info
+
+
+@receiver(post_save, sender=ReviewPostModel)
+@receiver(post_delete, sender=ReviewPostModel)
+@receiver(post_save, sender=ReviewPatchDeleteModel)
+@receiver(post_delete, sender=ReviewPatchDeleteModel)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def invalidate_base_info_snapshot(sender, **kwargs):
+    # Offer edits do not change the counts, only new offers do
+    if sender is Offer and kwargs.get("created") is False:
+        return
+    transaction.on_commit(invalidate_base_info)
@@ -1,3 +1,479 @@
-from django.test import TestCase
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from auth_app.models import UserProfile
+from core.testing import (
+    LOCMEM_CACHE, NO_CACHE, QueryPlanMixin, benchmark, benchmark_size, create_offer_detail,
+    create_user, encode_cursor, report_rows_per_second,
+)
+from notifications_app.models import OutboxEvent
+from offers_app.models import Offer
+from reviews_app import cache as base_info_cache
+from reviews_app.admin import ReviewPatchDeleteAdmin, ReviewPostAdmin
+from reviews_app.api.views import REVIEW_ORDERINGS, get_review_pagination
+from reviews_app.api.serializers import ReviewCompiledSerializer, ReviewPostResponseSerializer
+from reviews_app.models import BusinessRatingSummary, ReviewPatchDeleteModel, ReviewPostModel
+
+
+@override_settings(CACHES=NO_CACHE)
+class ReviewListTests(TestCase):
+    """
+    Tests for GET /api/reviews/.
+    """
+
+    def setUp(self):
+        self.business, self.client = create_user("business", "business")
+        self.ratings = {}
+        for i, rating in enumerate((3, None, 5, 3, None, 1, 5)):
+            _, client = create_user(f"customer{i}", "customer")
+            data = {"business_user": self.business.id, "description": "Review"}
+            if rating is not None:
+                data["rating"] = rating
+            response = client.post("/api/reviews/", data, format="json")
+            self.assertEqual(response.status_code, 201)
+            self.ratings[response.json()["id"]] = rating
+
+    def walk_cursor_pages(self, ordering):
+        """
+        Follows the next links for the given ordering and returns the ids of all pages.
+        """
+        ids = []
+        url = (f"/api/reviews/?pagination=cursor&page_size=2"
+               f"&business_user_id={self.business.id}&ordering={ordering}")
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [review["id"] for review in response.json()["results"]]
+            url = response.json()["next"]
+        return ids
+
+    def test_cursor_pages_order_by_rating_with_nulls_last(self):
+        rated = [i for i in self.ratings if self.ratings[i] is not None]
+        unrated = [i for i in self.ratings if self.ratings[i] is None]
+        by_rating = sorted(rated, key=lambda i: (self.ratings[i], i))
+        self.assertEqual(self.walk_cursor_pages("rating"), by_rating + sorted(unrated))
+        self.assertEqual(self.walk_cursor_pages("-rating"),
+                         by_rating[::-1] + sorted(unrated, reverse=True))
+
+    def test_cursor_pages_order_by_updated_at(self):
+        self.assertEqual(self.walk_cursor_pages("updated_at"), sorted(self.ratings))
+        self.assertEqual(self.walk_cursor_pages("-updated_at"),
+                         sorted(self.ratings, reverse=True))
+
+    def test_list_matches_cursor_order(self):
+        for ordering in REVIEW_ORDERINGS:
+            with self.subTest(ordering=ordering):
+                response = self.client.get("/api/reviews/", {
+                    "business_user_id": self.business.id, "ordering": ordering})
+                self.assertEqual([review["id"] for review in response.json()],
+                                 self.walk_cursor_pages(ordering))
+
+    def test_compiled_serializer_matches_model_serializer(self):
+        for url in ("/api/reviews/", "/api/reviews/?ordering=-rating",
+                    "/api/reviews/?pagination=cursor&page_size=3&ordering=rating"):
+            with self.subTest(url=url):
+                expected = self.client.get(url).json()
+                with override_settings(COMPILED_READ_SERIALIZERS=True):
+                    self.assertEqual(self.client.get(url).json(), expected)
+
+
+    def test_invalid_cursor_and_ordering(self):
+        for values in (["abc", 1], [{"a": 1}, 1], [None, 1]):
+            with self.subTest(values=values):
+                response = self.client.get(
+                    f"/api/reviews/?pagination=cursor&cursor={encode_cursor(values)}")
+                self.assertEqual(response.status_code, 404)
+        # NULL ratings are valid cursor positions
+        response = self.client.get(
+            f"/api/reviews/?pagination=cursor&ordering=rating&cursor={encode_cursor([None, 1])}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(
+            "/api/reviews/?pagination=cursor&ordering=bogus").status_code, 400)
+
+
+class ReviewQueryPlanTests(QueryPlanMixin, TestCase):
+    """
+    EXPLAIN-based tests that each filter and ordering of GET /api/reviews/
+    is served by an index, in list and cursor mode.
+    """
+
+    def get_queryset(self, ordering, cursor=None, **filters):
+        pagination = get_review_pagination(ordering)
+        pagination.position = cursor
+        return ReviewPostModel.objects.filter(**filters).filter(
+            pagination.get_keyset_q()).order_by(*pagination.get_order_by())[:21]
+
+    def assertServedByIndex(self, ordering, filters, *index_names):
+        cursors = [None, [3, 10] if "rating" in ordering else ["2026-01-01T00:00:00Z", 10]]
+        for cursor in cursors:
+            with self.subTest(ordering=ordering, filters=filters, cursor=cursor):
+                self.assertUsesIndex(
+                    self.get_queryset(ordering, cursor, **filters), *index_names, ordered=True)
+
+    def test_business_filter(self):
+        filters = {"business_user_id": 1}
+        for ordering in ("updated_at", "-updated_at"):
+            self.assertServedByIndex(ordering, filters, "review_business_updated_idx")
+        self.assertServedByIndex("rating", filters, "review_business_rating_idx")
+        # DESC NULLS LAST: PostgreSQL needs the descending index; SQLite sorts
+        # NULLs first, so it reads the ascending index backwards
+        if connection.vendor == "postgresql":
+            self.assertServedByIndex("-rating", filters, "review_business_rating_dsc_idx")
+        else:
+            self.assertServedByIndex(
+                "-rating", filters, "review_business_rating_idx", "review_business_rating_dsc_idx")
+
+    def test_reviewer_filter(self):
+        filters = {"reviewer_id": 1}
+        for ordering in ("updated_at", "-updated_at"):
+            self.assertServedByIndex(ordering, filters, "review_reviewer_updated_idx")
+        # A reviewer has few reviews; rating orders sort the index matches
+        for ordering in ("rating", "-rating"):
+            with self.subTest(ordering=ordering):
+                self.assertUsesIndex(
+                    self.get_queryset(ordering, reviewer_id=1), "review_reviewer_updated_idx")
+
+    def test_rating_desc_index_exists(self):
+        if connection.vendor == "postgresql":
+            sql = "SELECT indexdef FROM pg_indexes WHERE indexname = %s"
+            expected = "(business_user_id, rating DESC NULLS LAST, id DESC)"
+        else:
+            sql = "SELECT sql FROM sqlite_master WHERE name = %s"
+            expected = "(business_user_id, rating DESC, id DESC)"
+        with connection.cursor() as cursor:
+            cursor.execute(sql, ["review_business_rating_dsc_idx"])
+            row = cursor.fetchone()
+        self.assertIsNotNone(row)
+        self.assertIn(expected, row[0])
+
+@override_settings(CACHES=NO_CACHE)
+class BusinessRatingSummaryTests(TestCase):
+    """
+    Tests that BusinessRatingSummary follows every way a review is written.
+    """
+
+    def setUp(self):
+        self.business, self.business_client = create_user("business", "business")
+        self.other_business, _ = create_user("other", "business")
+        self.customer, self.client = create_user("customer", "customer")
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "pw12345678")
+
+    def assertSummariesMatchReviews(self):
+        expected = BusinessRatingSummary.build(ReviewPostModel.objects.all())
+        for business in (self.business, self.other_business):
+            summary = BusinessRatingSummary.objects.filter(business_user=business).first()
+            rebuilt = expected.get(business.id) or BusinessRatingSummary()
+            for field in ("review_count", "rating_count", "rating_sum", "histogram"):
+                self.assertEqual(
+                    getattr(summary or BusinessRatingSummary(), field),
+                    getattr(rebuilt, field), (business.username, field))
+
+    def test_summary_follows_post_patch_and_delete(self):
+        review_id = self.client.post(
+            "/api/reviews/", {"business_user": self.business.id, "rating": 5},
+            format="json").json()["id"]
+        self.assertSummariesMatchReviews()
+        self.client.patch(f"/api/reviews/{review_id}/", {"rating": 3}, format="json")
+        self.assertSummariesMatchReviews()
+        response = self.client.get(f"/api/reviews/summary/{self.business.id}/")
+        self.assertEqual(response.json()["average_rating"], 3.0)
+        self.assertEqual(response.json()["histogram"]["3"], 1)
+
+        self.client.delete(f"/api/reviews/{review_id}/")
+        self.assertSummariesMatchReviews()
+        response = self.client.get(f"/api/reviews/summary/{self.business.id}/")
+        self.assertEqual(response.json()["review_count"], 0)
+        self.assertIsNone(response.json()["average_rating"])
+
+    def test_summary_follows_admin_changes(self):
+        request = RequestFactory().post("/admin/")
+        request.user = self.admin
+        for model, admin_class in ((ReviewPostModel, ReviewPostAdmin),
+                                   (ReviewPatchDeleteModel, ReviewPatchDeleteAdmin)):
+            with self.subTest(admin=admin_class.__name__):
+                model_admin = admin_class(model, site)
+                review = model(business_user=self.business, reviewer=self.customer, rating=4)
+                model_admin.save_model(request, review, None, change=False)
+                self.assertSummariesMatchReviews()
+
+                review.rating = None
+                model_admin.save_model(request, review, None, change=True)
+                self.assertSummariesMatchReviews()
+
+                review.business_user, review.rating = self.other_business, 2
+                model_admin.save_model(request, review, None, change=True)
+                self.assertSummariesMatchReviews()
+
+                model_admin.delete_model(request, review)
+                self.assertSummariesMatchReviews()
+
+        model_admin = ReviewPostAdmin(ReviewPostModel, site)
+        for business, rating in ((self.business, 1), (self.other_business, 5)):
+            model_admin.save_model(request, ReviewPostModel(
+                business_user=business, reviewer=self.customer, rating=rating), None, change=False)
+        model_admin.delete_queryset(request, ReviewPostModel.objects.all())
+        self.assertFalse(ReviewPostModel.objects.exists())
+        self.assertSummariesMatchReviews()
+
+    def test_reconcile_rebuilds_summaries(self):
+        self.client.post(
+            "/api/reviews/", {"business_user": self.business.id, "rating": 4}, format="json")
+        self.client.post("/api/reviews/", {"business_user": self.other_business.id}, format="json")
+        BusinessRatingSummary.objects.update(rating_sum=99)
+        call_command("reconcile_rating_summaries", stdout=StringIO())
+        self.assertSummariesMatchReviews()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BaseInfoTests(TestCase):
+    """
+    Tests for GET /api/base-info/ and its cached snapshot.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.business, _ = create_user("business", "business")
+        create_offer_detail(self.business)
+        for i, rating in enumerate((5, 2, None)):
+            _, client = create_user(f"customer{i}", "customer")
+            data = {"business_user": self.business.id}
+            if rating is not None:
+                data["rating"] = rating
+            client.post("/api/reviews/", data, format="json")
+
+    def get_base_info(self):
+        response = self.client.get("/api/base-info/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_values(self):
+        self.assertEqual(self.get_base_info(), {
+            "review_count": 3,
+            "average_rating": 3.5,
+            "business_profile_count": 1,
+            "offer_count": 1,
+        })
+
+    def test_snapshot_is_served_until_a_change_commits(self):
+        self.get_base_info()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_base_info()["offer_count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_offer_detail(self.business)
+        self.assertEqual(self.get_base_info()["offer_count"], 2)
+
+    def test_stale_snapshot_is_served_while_another_request_recomputes(self):
+        self.get_base_info()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_offer_detail(self.business)
+        cache.add(base_info_cache.BASE_INFO_LOCK_KEY, True)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_base_info()["offer_count"], 1)
+        cache.delete(base_info_cache.BASE_INFO_LOCK_KEY)
+        self.assertEqual(self.get_base_info()["offer_count"], 2)
+
+
+def get_concurrently(url, thread_count, requests_per_thread):
+    """
+    Sends requests_per_thread GET requests to url from each of thread_count
+    threads at once and returns the status codes and latencies in seconds.
+    """
+    barrier = threading.Barrier(thread_count)
+
+    def worker():
+        client = APIClient()
+        results = []
+        barrier.wait()
+        try:
+            for _ in range(requests_per_thread):
+                started_at = time.perf_counter()
+                status_code = client.get(url).status_code
+                results.append((status_code, time.perf_counter() - started_at))
+        finally:
+            connection.close()
+        return results
+
+    with ThreadPoolExecutor(thread_count) as pool:
+        futures = [pool.submit(worker) for _ in range(thread_count)]
+        results = [result for future in futures for result in future.result()]
+    return [status for status, _ in results], [latency for _, latency in results]
+
+
+def p99(latencies):
+    return statistics.quantiles(latencies, n=100)[98]
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BaseInfoLoadTests(TransactionTestCase):
+    """
+    Concurrent requests to GET /api/base-info/. A TransactionTestCase,
+    as the request threads use their own database connections.
+    """
+
+    def setUp(self):
+        cache.clear()
+        business, _ = create_user("business", "business")
+        create_offer_detail(business)
+
+    def test_cold_cache_is_computed_once(self):
+        compute_base_info = base_info_cache.compute_base_info
+
+        def slow_compute_base_info():
+            # Long enough for every thread to miss the cold cache
+            time.sleep(0.2)
+            return compute_base_info()
+
+        with patch("reviews_app.cache.compute_base_info",
+                   side_effect=slow_compute_base_info) as compute:
+            statuses, latencies = get_concurrently("/api/base-info/", 16, 5)
+        self.assertEqual(statuses, [200] * 80)
+        self.assertEqual(compute.call_count, 1)
+        # Waiters return shortly after the one computation, not after their own
+        self.assertLess(p99(latencies), base_info_cache.BASE_INFO_WAIT_TIMEOUT)
+
+
+@override_settings(CACHES=NO_CACHE)
+class ReviewWriteTests(TestCase):
+    """
+    Tests for creating, replacing and deleting reviews and the rating summary.
+    """
+
+    def setUp(self):
+        self.business, self.business_client = create_user("business", "business")
+        self.customer, self.client = create_user("customer", "customer")
+
+    def get_summary(self):
+        summary = BusinessRatingSummary.objects.get(business_user=self.business)
+        return summary.review_count, summary.rating_sum, summary.histogram
+
+    def test_post_rejects_second_review(self):
+        data = {"business_user": self.business.id, "rating": 4}
+        self.assertEqual(self.client.post("/api/reviews/", data, format="json").status_code, 201)
+        self.assertEqual(self.client.post("/api/reviews/", data, format="json").status_code, 400)
+        self.assertEqual(ReviewPostModel.objects.count(), 1)
+
+    def test_put_creates_then_replaces_review(self):
+        data = {"business_user": self.business.id, "rating": 4, "description": "Good"}
+        response = self.client.put("/api/reviews/", data, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.get_summary()[:2], (1, 4))
+
+        data = {"business_user": self.business.id, "rating": 2, "description": "Worse"}
+        response = self.client.put("/api/reviews/", data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["rating"], response.json()["description"]),
+                         (2, "Worse"))
+        self.assertEqual(ReviewPostModel.objects.count(), 1)
+        review_count, rating_sum, histogram = self.get_summary()
+        self.assertEqual((review_count, rating_sum), (1, 2))
+        self.assertEqual(histogram["2"], 1)
+        self.assertEqual(histogram["4"], 0)
+        self.assertEqual(OutboxEvent.objects.filter(topic="review.created").count(), 1)
+
+    def test_put_replaces_a_posted_review_with_one_statement(self):
+        self.client.post("/api/reviews/", {"business_user": self.business.id}, format="json")
+        data = {"business_user": self.business.id, "rating": 5, "description": "Great"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put("/api/reviews/", data, format="json")
+        self.assertEqual(response.status_code, 200)
+        review_queries = [query["sql"] for query in queries
+                          if ReviewPostModel._meta.db_table in query["sql"]]
+        self.assertEqual(len(review_queries), 1, review_queries)
+        self.assertTrue(review_queries[0].startswith("INSERT"))
+        self.assertEqual(self.get_summary()[:2], (1, 5))
+        review = ReviewPostModel.objects.get()
+        self.assertEqual((review.replaced, review.previous_rating), (True, None))
+        self.assertEqual(response.json()["created_at"],
+                         self.client.get("/api/reviews/").json()[0]["created_at"])
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_put_invalidates_base_info(self):
+        cache.clear()
+        self.assertEqual(self.client.get("/api/base-info/").json()["review_count"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put("/api/reviews/", {"business_user": self.business.id, "rating": 4},
+                            format="json")
+        self.assertEqual(self.client.get("/api/base-info/").json()["review_count"], 1)
+
+    def test_put_requires_customer(self):
+        data = {"business_user": self.business.id, "rating": 5}
+        self.assertEqual(
+            self.business_client.put("/api/reviews/", data, format="json").status_code, 403)
+
+
+@benchmark
+class ReviewSerializerBenchmark(TestCase):
+    """
+    Rows per second of the review list serializers, ModelSerializer vs compiled.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        reviewer, _ = create_user("customer", "customer")
+        cls.review_count = benchmark_size(10000)
+        businesses = User.objects.bulk_create(
+            [User(username=f"business{i}") for i in range(cls.review_count)],
+            batch_size=1000,
+        )
+        ReviewPostModel.objects.bulk_create(
+            [ReviewPostModel(business_user=business, reviewer=reviewer, rating=i % 5 + 1,
+                             description="Great work")
+             for i, business in enumerate(businesses)],
+            batch_size=1000,
+        )
+
+    def test_review_list_rows_per_second(self):
+        def model_serializer():
+            return ReviewPostResponseSerializer(ReviewPostModel.objects.all(), many=True).data
+
+        def compiled():
+            reviews = ReviewPostModel.objects.values(*ReviewCompiledSerializer.value_lookups())
+            return ReviewCompiledSerializer(reviews).data
+
+        rates = report_rows_per_second("GET /api/reviews/", self.review_count, {
+            "ModelSerializer": model_serializer, "compiled": compiled})
+        self.assertGreater(rates["compiled"], rates["ModelSerializer"])
+
+
+@benchmark
+@override_settings(CACHES=LOCMEM_CACHE, BASE_INFO_CACHE_TIMEOUT=1)
+class BaseInfoLoadBenchmark(TransactionTestCase):
+    """
+    p99 latency of GET /api/base-info/ under concurrent load, with the
+    coalesced snapshot vs computing the statistics on every request.
+    """
+
+    def setUp(self):
+        cache.clear()
+        business_count = benchmark_size(20000)
+        users = User.objects.bulk_create(
+            [User(username=f"business{i}") for i in range(business_count)], batch_size=1000)
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=user, type="business") for user in users], batch_size=1000)
+        Offer.objects.bulk_create(
+            [Offer(user=user, title="Logo", description="Logo design") for user in users],
+            batch_size=1000)
+
+    def test_p99_latency(self):
+        _, coalesced = get_concurrently("/api/base-info/", 16, 50)
+        with patch("reviews_app.api.views.get_base_info", base_info_cache.compute_base_info):
+            _, uncached = get_concurrently("/api/base-info/", 16, 50)
+        print(f"\nGET /api/base-info/ ({len(coalesced)} requests, 16 threads): "
+              f"p99 snapshot {p99(coalesced) * 1000:.1f} ms, "
+              f"computed per request {p99(uncached) * 1000:.1f} ms")
+        self.assertLess(p99(coalesced), p99(uncached))